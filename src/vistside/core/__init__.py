@@ -11,9 +11,27 @@ from ._colors import *  # Only acceptable use of wildcard import
 from ._qt_enums import *  # Only acceptable use of wildcard import
 
 from ._white_noisinator import generateWhiteNoise, interpolateWhiteNoise
+from ._decimation_mode import DecimationMode
+from ._decimate import decimate, decimateMinMax, decimateLTTB
+from ._plot_mode import PlotMode
+from ._tick_engine import TickEngine
 from ._array_field import ArrayField
+from ._monotonic_field import MonotonicField
 from ._right_now_field import RightNowField
+from ._dispatch_mode import DispatchMode
+from ._data_roll_subscriber import DataRollSubscriber
+from ._data_pyramid import DataPyramid
+from ._data_archive import DataArchive
+from ._running_stats import RunningStats
 from ._data_roll import DataRoll, DataRollField
+from ._multi_data_roll import MultiDataRoll, MultiDataRollField
+from ._shared_data_roll import SharedDataRoll
+from ._spectrogram import Spectrogram
+from ._fir_filter import FirFilter
+from ._iir_filter import IirFilter
+from ._filter_chain import FilterChain
+from ._signal_kind import SignalKind
+from ._signal_source import SignalSource
 from ._color_factory import parseColor
 from ._brush_factory import parseBrush, emptyBrush, solidBrush
 from ._brush_field import BrushField
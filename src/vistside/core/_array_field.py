@@ -16,6 +16,9 @@ class ArrayField(MutableDescriptor):
   """ArrayField class for storing and manipulating arrays of data."""
 
   __fallback_num_data__ = 128
+  __fallback_dtype__ = complex
+  __array_dtype__ = None
+  __channel_axis__ = None
 
   numData = IntField()
 
@@ -37,6 +40,14 @@ class ArrayField(MutableDescriptor):
           break
       else:
         self.numData = self.__fallback_num_data__
+    dtypeKeys = stringList("""dtype, dataType, type_""")
+    for key in dtypeKeys:
+      if key in kwargs:
+        self.__array_dtype__ = np.dtype(kwargs.get(key))
+        break
+    else:
+      self.__array_dtype__ = np.dtype(self.__fallback_dtype__)
+    self.__channel_axis__ = True if kwargs.get('channels', False) else False
     MutableDescriptor.__init__(self, np.ndarray, *args, **kwargs)
     self._setFieldType(np.ndarray)
 
@@ -44,8 +55,15 @@ class ArrayField(MutableDescriptor):
     """Instantiates the field."""
     n = getattr(instance, 'arrayLength', self.__fallback_num_data__)
     pvtName = self._getPrivateName()
-    array = np.full((n,), np.nan, dtype=complex)
-    setattr(instance, self._getPrivateName(), array)
+    dtype = self.__array_dtype__
+    shape = (n,)
+    if self.__channel_axis__:
+      shape = (n, getattr(instance, 'channelCount', 1))
+    if np.issubdtype(dtype, np.inexact):
+      array = np.full(shape, np.nan, dtype=dtype)
+    else:
+      array = np.zeros(shape, dtype=dtype)
+    setattr(instance, pvtName, array)
 
   def __get__(self, instance: object, owner: type, **kwargs) -> Any:
     """Returns the value of the field."""
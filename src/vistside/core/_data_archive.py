@@ -0,0 +1,172 @@
+"""DataArchive keeps the samples evicted from a DataRoll in memory mapped
+chunk files on disk."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+import os
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+from numpy.lib.format import open_memmap
+from vistutils.text import monoSpace
+from vistutils.waitaminute import typeMsg
+
+
+class DataArchive:
+  """DataArchive keeps the samples evicted from a DataRoll in memory
+  mapped chunk files on disk. Each chunk holds 'chunkLength' samples in a
+  time file and a value file in the .npy format, so a chunk can also be
+  opened directly with 'np.load'. Samples are addressed by the same
+  absolute index as in the DataRoll, and the first timestamp of each
+  chunk is kept in memory as the time index.
+
+  Reading a range copies only the requested samples. Locating a time
+  bisects the time index and then searches the single chunk holding it,
+  so the operating system only pages in the parts of the files that are
+  actually read."""
+
+  __directory__ = None
+  __chunk_length__ = None
+  __time_type__ = None
+  __value_type__ = None
+  __channels__ = None
+  __time_chunks__ = None
+  __value_chunks__ = None
+  __first_times__ = None
+  __first_index__ = None
+  __count__ = None
+
+  def __init__(self,
+               directory: str,
+               chunkLength: int = None,
+               timeType: np.dtype = None,
+               valueType: np.dtype = None,
+               channels: tuple = (),
+               firstIndex: int = None) -> None:
+    if not isinstance(directory, str):
+      e = typeMsg('directory', directory, str)
+      raise TypeError(e)
+    chunkLength = 2 ** 20 if chunkLength is None else chunkLength
+    if not isinstance(chunkLength, int):
+      e = typeMsg('chunkLength', chunkLength, int)
+      raise TypeError(e)
+    os.makedirs(directory, exist_ok=True)
+    if os.path.exists(self._getChunkPath(directory, 'times', 0)):
+      e = """The directory '%s' already holds an archive!"""
+      raise FileExistsError(monoSpace(e % directory))
+    self.__directory__ = directory
+    self.__chunk_length__ = max(chunkLength, 1)
+    self.__time_type__ = np.dtype(np.int64 if timeType is None else timeType)
+    self.__value_type__ = np.dtype(
+      np.float64 if valueType is None else valueType)
+    self.__channels__ = tuple(channels)
+    self.__time_chunks__ = []
+    self.__value_chunks__ = []
+    self.__first_times__ = []
+    self.__first_index__ = 0 if firstIndex is None else firstIndex
+    self.__count__ = 0
+
+  @staticmethod
+  def _getChunkPath(directory: str, column: str, chunk: int) -> str:
+    """Returns the path to the file holding the given column of the
+    given chunk."""
+    return os.path.join(directory, '%s_%06d.npy' % (column, chunk))
+
+  def _openChunk(self, ) -> None:
+    """Creates the files of the next chunk."""
+    chunk = len(self.__time_chunks__)
+    timePath = self._getChunkPath(self.__directory__, 'times', chunk)
+    valuePath = self._getChunkPath(self.__directory__, 'values', chunk)
+    n = self.__chunk_length__
+    if self.__time_chunks__:
+      self.__time_chunks__[-1].flush()
+      self.__value_chunks__[-1].flush()
+    self.__time_chunks__.append(
+      open_memmap(timePath, 'w+', self.__time_type__, (n,)))
+    self.__value_chunks__.append(
+      open_memmap(valuePath, 'w+', self.__value_type__,
+                  (n, *self.__channels__)))
+
+  def __len__(self, ) -> int:
+    """Returns the number of archived samples."""
+    return self.__count__
+
+  @property
+  def firstIndex(self, ) -> int:
+    """Returns the absolute index of the first archived sample."""
+    return self.__first_index__
+
+  @property
+  def stopIndex(self, ) -> int:
+    """Returns the absolute index following the last archived sample."""
+    return self.__first_index__ + self.__count__
+
+  def append(self, times: np.ndarray, values: np.ndarray) -> None:
+    """Appends a block of samples, opening new chunks as needed."""
+    k, n, written = times.shape[0], self.__chunk_length__, 0
+    while written < k:
+      chunk, position = divmod(self.__count__, n)
+      if chunk == len(self.__time_chunks__):
+        self._openChunk()
+        self.__first_times__.append(times[written].item())
+      count = min(k - written, n - position)
+      stop = position + count
+      self.__time_chunks__[chunk][position:stop] = times[written:][:count]
+      self.__value_chunks__[chunk][position:stop] = values[written:][:count]
+      self.__count__ += count
+      written += count
+
+  def appendOne(self, t: int, value: float) -> None:
+    """Appends a single sample without the array operations of
+    'append'."""
+    chunk, position = divmod(self.__count__, self.__chunk_length__)
+    if chunk == len(self.__time_chunks__):
+      self._openChunk()
+      self.__first_times__.append(self.__time_type__.type(t).item())
+    self.__time_chunks__[chunk][position] = t
+    self.__value_chunks__[chunk][position] = value
+    self.__count__ += 1
+
+  def searchTime(self, t: int, side: str = 'left') -> int:
+    """Returns the absolute index at which 't' would be inserted in the
+    archived timestamps."""
+    if not self.__count__:
+      return self.__first_index__
+    bisect = bisect_left if side == 'left' else bisect_right
+    chunk = max(bisect(self.__first_times__, t) - 1, 0)
+    n = self.__chunk_length__
+    used = min(self.__count__ - chunk * n, n)
+    times = self.__time_chunks__[chunk][:used]
+    index = chunk * n + int(np.searchsorted(times, t, side))
+    return self.__first_index__ + index
+
+  def read(self, start: int, stop: int) -> tuple[np.ndarray, np.ndarray]:
+    """Returns copies of the archived times and values from absolute
+    index 'start' up to 'stop'. The range is clipped to the archive."""
+    n = self.__chunk_length__
+    start = max(start - self.__first_index__, 0)
+    stop = min(stop - self.__first_index__, self.__count__)
+    timeParts, valueParts = [], []
+    while start < stop:
+      chunk, position = divmod(start, n)
+      count = min(stop - start, n - position)
+      timeParts.append(self.__time_chunks__[chunk][position:][:count])
+      valueParts.append(self.__value_chunks__[chunk][position:][:count])
+      start += count
+    if not timeParts:
+      return (np.empty((0,), dtype=self.__time_type__),
+              np.empty((0, *self.__channels__), dtype=self.__value_type__))
+    return np.concatenate(timeParts), np.concatenate(valueParts)
+
+  def flush(self, ) -> None:
+    """Writes any modified pages of the current chunk to disk."""
+    if self.__time_chunks__:
+      self.__time_chunks__[-1].flush()
+      self.__value_chunks__[-1].flush()
+
+  def close(self, ) -> None:
+    """Flushes and releases the memory maps. The files remain on disk."""
+    self.flush()
+    self.__time_chunks__ = []
+    self.__value_chunks__ = []
@@ -0,0 +1,194 @@
+"""DataPyramid maintains min, max and mean summaries of a DataRoll at
+successively coarser resolutions."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+import numpy as np
+from vistutils.waitaminute import typeMsg
+
+
+class DataPyramid:
+  """DataPyramid maintains min, max and mean summaries of a DataRoll at
+  successively coarser resolutions. Level 0 summarizes buckets of 4
+  samples, level 1 buckets of 16 samples and so on, up to the length of
+  the roll. Buckets are addressed by the absolute sample index divided by
+  the bucket size, and each level is a ring holding every bucket that
+  overlaps the samples held by the roll.
+
+  Appending a block updates only the buckets it touches: level 0 is
+  reduced from the new samples, and each coarser level is recomputed
+  from the four children of its touched buckets. The cost of an append is
+  therefore linear in the block length, and the cost of reading a level
+  is linear in the number of buckets read."""
+
+  __factor__ = 4
+
+  __bucket_sizes__ = None
+  __ring_sizes__ = None
+  __mins__ = None
+  __maxs__ = None
+  __sums__ = None
+  __counts__ = None
+  __touched__ = None
+  __valid_start__ = None
+  __next_index__ = None
+
+  def __init__(self, capacity: int, channels: tuple = ()) -> None:
+    if not isinstance(capacity, int):
+      e = typeMsg('capacity', capacity, int)
+      raise TypeError(e)
+    self.__bucket_sizes__ = []
+    self.__ring_sizes__ = []
+    self.__mins__ = []
+    self.__maxs__ = []
+    self.__sums__ = []
+    self.__counts__ = []
+    self.__touched__ = []
+    bucketSize = self.__factor__
+    while bucketSize <= capacity:
+      ringSize = max(capacity // bucketSize + 2, 2 * self.__factor__)
+      shape = (ringSize, *channels)
+      self.__bucket_sizes__.append(bucketSize)
+      self.__ring_sizes__.append(ringSize)
+      self.__mins__.append(np.full(shape, np.inf))
+      self.__maxs__.append(np.full(shape, -np.inf))
+      self.__sums__.append(np.zeros(shape))
+      self.__counts__.append(np.zeros((ringSize,), dtype=np.int64))
+      self.__touched__.append((0, -1))
+      bucketSize *= self.__factor__
+    self.__valid_start__ = 0
+    self.__next_index__ = 0
+
+  def __len__(self, ) -> int:
+    """Returns the number of levels."""
+    return len(self.__bucket_sizes__)
+
+  def bucketSize(self, level: int) -> int:
+    """Returns the number of samples summarized by each bucket at the
+    given level."""
+    return self.__bucket_sizes__[level]
+
+  def update(self, start: int, values: np.ndarray) -> None:
+    """Updates the buckets touched by the block of values whose first
+    sample has the absolute index 'start'."""
+    k = values.shape[0]
+    if not k or not len(self):
+      return
+    if start != self.__next_index__:
+      self.__valid_start__ = start
+    self.__next_index__ = start + k
+    self._updateBase(start, values)
+    for level in range(1, len(self)):
+      self._updateLevel(level)
+
+  def updateOne(self, index: int, value: float) -> None:
+    """Updates every level with a single sample. As only one sample is
+    added, each level merges it directly into its bucket, avoiding the
+    array operations of 'update'."""
+    if not len(self):
+      return
+    if index != self.__next_index__:
+      self.__valid_start__ = index
+    fresh = True if index == self.__valid_start__ else False
+    self.__next_index__ = index + 1
+    for level in range(len(self)):
+      f = self.__bucket_sizes__[level]
+      bucket = index // f
+      slot = bucket % self.__ring_sizes__[level]
+      if fresh or not index % f:
+        self.__mins__[level][slot] = value
+        self.__maxs__[level][slot] = value
+        self.__sums__[level][slot] = value
+        self.__counts__[level][slot] = 1
+      else:
+        if value < self.__mins__[level][slot]:
+          self.__mins__[level][slot] = value
+        if value > self.__maxs__[level][slot]:
+          self.__maxs__[level][slot] = value
+        self.__sums__[level][slot] += value
+        self.__counts__[level][slot] += 1
+      self.__touched__[level] = (bucket, bucket)
+
+  def _updateBase(self, start: int, values: np.ndarray) -> None:
+    """Reduces the new samples into the buckets of level 0."""
+    f, size = self.__bucket_sizes__[0], self.__ring_sizes__[0]
+    k = values.shape[0]
+    offset = (-start) % f
+    cuts = np.arange(offset, k, f)
+    if offset:
+      cuts = np.concatenate(([0], cuts))
+    mins = np.minimum.reduceat(values, cuts, axis=0)
+    maxs = np.maximum.reduceat(values, cuts, axis=0)
+    sums = np.add.reduceat(values, cuts, axis=0)
+    counts = np.diff(np.append(cuts, k))
+    b0, b1 = start // f, (start + k - 1) // f
+    if start % f and start != self.__valid_start__:
+      slot = b0 % size
+      mins[0] = np.minimum(mins[0], self.__mins__[0][slot])
+      maxs[0] = np.maximum(maxs[0], self.__maxs__[0][slot])
+      sums[0] = sums[0] + self.__sums__[0][slot]
+      counts[0] += self.__counts__[0][slot]
+    slots = np.arange(b0, b1 + 1) % size
+    self.__mins__[0][slots] = mins
+    self.__maxs__[0][slots] = maxs
+    self.__sums__[0][slots] = sums
+    self.__counts__[0][slots] = counts
+    self.__touched__[0] = (b0, b1)
+
+  def _updateLevel(self, level: int) -> None:
+    """Recomputes the buckets of the given level whose children were
+    touched by the most recent update."""
+    child = level - 1
+    cb0, cb1 = self.__touched__[child]
+    fChild = self.__bucket_sizes__[child]
+    childSize = self.__ring_sizes__[child]
+    size = self.__ring_sizes__[level]
+    p0, p1 = cb0 // self.__factor__, cb1 // self.__factor__
+    children = np.arange(p0 * self.__factor__, (p1 + 1) * self.__factor__)
+    valid = children <= cb1
+    valid &= (children + 1) * fChild > self.__valid_start__
+    slots = children % childSize
+    shape = (p1 - p0 + 1, self.__factor__, *self.__mins__[child].shape[1:])
+    mask = valid.reshape(shape[:2] + (1,) * (len(shape) - 2))
+    mins = np.where(mask, self.__mins__[child][slots].reshape(shape), np.inf)
+    maxs = np.where(mask, self.__maxs__[child][slots].reshape(shape),
+                    -np.inf)
+    sums = np.where(mask, self.__sums__[child][slots].reshape(shape), 0.0)
+    counts = np.where(valid, self.__counts__[child][slots], 0)
+    parents = np.arange(p0, p1 + 1) % size
+    self.__mins__[level][parents] = mins.min(axis=1)
+    self.__maxs__[level][parents] = maxs.max(axis=1)
+    self.__sums__[level][parents] = sums.sum(axis=1)
+    self.__counts__[level][parents] = counts.reshape(shape[:2]).sum(axis=1)
+    self.__touched__[level] = (p0, p1)
+
+  def chooseLevel(self, span: int, width: int) -> int:
+    """Returns the finest level at which 'span' samples fit in at most
+    'width' buckets, or -1 if the raw samples fit in twice the width."""
+    if span <= 2 * width or not len(self):
+      return -1
+    for (level, f) in enumerate(self.__bucket_sizes__):
+      if span <= width * f:
+        return level
+    return len(self) - 1
+
+  def read(self,
+           level: int,
+           start: int,
+           stop: int) -> tuple[np.ndarray, ...]:
+    """Returns the first absolute index together with the min, max and
+    mean of every bucket at the given level overlapping the absolute range
+    from 'start' to 'stop'. Buckets at the edges may include samples just
+    outside the range."""
+    f, size = self.__bucket_sizes__[level], self.__ring_sizes__[level]
+    b0, b1 = start // f, (stop - 1) // f
+    buckets = np.arange(b0, b1 + 1)
+    slots = buckets % size
+    counts = self.__counts__[level][slots]
+    sums = self.__sums__[level][slots]
+    with np.errstate(invalid='ignore', divide='ignore'):
+      means = sums / counts.reshape((-1,) + (1,) * (sums.ndim - 1))
+    first = np.maximum(buckets * f, start)
+    mins, maxs = self.__mins__[level][slots], self.__maxs__[level][slots]
+    return first, mins, maxs, means
@@ -4,90 +4,283 @@ another."""
 #  Copyright (c) 2024 Asger Jon Vistisen
 from __future__ import annotations
 
+import time
+from math import ceil
 from typing import Callable, Any
 
 import numpy as np
-from icecream import ic
+from PySide6.QtCore import QCoreApplication, QTimer
 from vistutils.fields import unParseArgs, Wait, IntField
+from vistutils.text import monoSpace
 from vistutils.waitaminute import typeMsg
 
-from vistside.core import ArrayField, RightNowField
+from vistside.core import ArrayField, MonotonicField, DispatchMode
+from vistside.core import DataRollSubscriber, DataPyramid, DataArchive
+from vistside.core import RunningStats
 
 
 class _Im:
-  """Retrieves the imaginary part of the series."""
+  """Retrieves the values of the series."""
 
   def __get__(self, instance: DataRoll, owner: type) -> np.ndarray:
-    """Returns the imaginary part of the last value."""
-    return instance.toArray().imag
+    """Returns the values of the series in chronological order."""
+    return instance.readValues()
 
 
 class _Re:
-  """Retrieves the real part of the series."""
+  """Retrieves the timestamps of the series."""
 
   def __get__(self, instance: DataRoll, owner: type) -> np.ndarray:
-    """Returns the real part of the last value."""
-    return instance.toArray().real
+    """Returns the timestamps of the series in chronological order as
+    seconds."""
+    return instance.readSeconds()
 
 
 class DataRoll:
   """The DataEcho class provides a way to echo data from one object to
-  another."""
+  another. Timestamps in nanoseconds since the epoch of the
+  MonotonicField and values are kept in separate columns."""
 
   __callback_functions__ = None
   __zero_index__ = None
+  __fill_count__ = None
+  __total_count__ = None
+  __sequence__ = None
+  __dispatch_mode__ = DispatchMode.IMMEDIATE
+  __dispatch_interval__ = 0.0
+  __last_dispatch__ = None
+  __flush_pending__ = None
+  __flush_due__ = None
+  __pyramid__ = None
+  __archive__ = None
+  __stats__ = None
+
+  __max_retries__ = 64
 
   imag = _Im()
   real = _Re()
-  rightNow = RightNowField()
-  array = ArrayField(16)
+  rightNow = MonotonicField()
+  timeArray = ArrayField(dtype=np.int64)
+  valueArray = ArrayField(dtype=np.float64)
   arrayLength = IntField(64)
 
   def __init__(self, *args, **kwargs) -> None:
     self.__callback_functions__ = []
     self.__zero_index__ = 0
+    self.__fill_count__ = 0
+    self.__total_count__ = 0
+    self.__sequence__ = 0
+    self.__flush_pending__ = False
 
-  def appendCallback(self, callMeMaybe: Callable) -> Callable:
-    """Notify the DataEcho object when a value is appended."""
-    if not callable(callMeMaybe):
-      e = typeMsg('callMeMaybe', callMeMaybe, Callable)
-      raise TypeError(e)
-    self.__callback_functions__.append(callMeMaybe)
+  def appendCallback(self,
+                     callMeMaybe: Callable,
+                     minInterval: float = None) -> Callable:
+    """Notify the DataEcho object when a value is appended. The callback
+    receives the absolute indices (start, stop) of the new samples. If
+    'minInterval' is given, the callback is notified at most once per
+    that many seconds."""
+    subscriber = DataRollSubscriber(callMeMaybe,
+                                    minInterval,
+                                    self.__total_count__)
+    self.__callback_functions__.append(subscriber)
     return callMeMaybe
 
   def CALL(self, callMeMaybe: Callable) -> Callable:
     """Call the callback functions."""
     return self.appendCallback(callMeMaybe)
 
-  def notifyCallbacks(self, val: complex) -> None:
-    """Notify the callback functions."""
-    for func in self.__callback_functions__:
-      func()
+  def setDispatchMode(self,
+                      mode: DispatchMode,
+                      interval: float = None) -> None:
+    """Sets when the subscribers are notified. By default they are
+    notified on every append. DispatchMode.INTERVAL and DispatchMode.FRAME
+    coalesce the notifications to at most one per interval in seconds or
+    one per turn of the Qt event loop. These are delivered on the thread
+    of the application, or without an application by the first append
+    after they are due. Each subscriber may further limit its own
+    rate."""
+    if not isinstance(mode, DispatchMode):
+      e = typeMsg('mode', mode, DispatchMode)
+      raise TypeError(e)
+    if interval is not None:
+      if not isinstance(interval, (int, float)):
+        e = typeMsg('interval', interval, float)
+        raise TypeError(e)
+      self.__dispatch_interval__ = float(interval)
+    self.__dispatch_mode__ = mode
+
+  def _scheduleFlush(self, delay: float) -> None:
+    """Schedules a flush on the thread of the application after the
+    given delay in seconds, unless one is already pending. Without an
+    application, the time the flush is due is kept instead, and the flush
+    happens on the first notification after that time."""
+    if self.__flush_pending__:
+      return
+    app = QCoreApplication.instance()
+    if app is None:
+      due = time.monotonic() + delay
+      if self.__flush_due__ is None or due < self.__flush_due__:
+        self.__flush_due__ = due
+      return
+    self.__flush_pending__ = True
+    QTimer.singleShot(int(ceil(delay * 1000)), app, self.flushCallbacks)
+
+  def notifyCallbacks(self, ) -> None:
+    """Notify the callback functions according to the dispatch mode."""
+    if not self.__callback_functions__:
+      return
+    due = self.__flush_due__
+    if due is not None and time.monotonic() >= due:
+      return self.flushCallbacks()
+    if self.__dispatch_mode__ is DispatchMode.IMMEDIATE:
+      return self.flushCallbacks()
+    if self.__dispatch_mode__ is DispatchMode.FRAME:
+      return self._scheduleFlush(0)
+    now = time.monotonic()
+    if self.__last_dispatch__ is None:
+      wait = 0.0
+    else:
+      wait = self.__dispatch_interval__ - (now - self.__last_dispatch__)
+    if wait > 0:
+      return self._scheduleFlush(wait)
+    self.flushCallbacks()
+
+  def flushCallbacks(self, ) -> None:
+    """Notifies every subscriber of the samples appended since its last
+    notification. Subscribers held back by their own rate limit are
+    retried once the earliest of them may be notified again."""
+    self.__flush_pending__ = False
+    self.__flush_due__ = None
+    now = time.monotonic()
+    self.__last_dispatch__ = now
+    stop = self.__total_count__
+    deferred = []
+    for subscriber in self.__callback_functions__:
+      if subscriber.offer(stop, now):
+        deferred.append(subscriber.remaining(now))
+    if deferred:
+      self._scheduleFlush(min(deferred))
 
   def append(self, value: float = None) -> None:
     """Append a value to the DataEcho object."""
     if not value == value:
       return
-    if isinstance(value, int):
-      value = float(value) + 0j
     if isinstance(value, complex):
       value = value.imag
-    self.array[self.__zero_index__] = self.rightNow + value * 1j
-    entry = None
-    try:
-      entry = self.array[self.__zero_index__]
-      self.notifyCallbacks(entry.item())
-    except ValueError as valueError:
-      ic(entry)
-      ic(self.__zero_index__)
-      raise valueError
-    self.__zero_index__ = (self.__zero_index__ + 1) % len(self.array)
+    rightNow = self.rightNow
+    times, values = self.timeArray, self.valueArray
+    n, index, fill = times.shape[0], self.__zero_index__, self.__fill_count__
+    if fill == n:
+      if self.__archive__ is not None:
+        self.__archive__.appendOne(times[index], values[index])
+      if self.__stats__ is not None:
+        self.__stats__.removeOne(float(values[index]))
+    self.__sequence__ += 1
+    times[index] = rightNow
+    values[index] = value
+    self.__zero_index__ = (index + 1) % n
+    self.__fill_count__ = min(fill + 1, n)
+    self.__total_count__ += 1
+    self.__sequence__ += 1
+    if self.__pyramid__ is not None:
+      self.__pyramid__.updateOne(self.__total_count__ - 1, value)
+    if self.__stats__ is not None:
+      oldest = self.__total_count__ - self.__fill_count__
+      self.__stats__.addOne(self.__total_count__ - 1, value, oldest)
+      self._refreshStats()
+    self.notifyCallbacks()
+
+  def appendMany(self, values: Any, timestamps: Any = None) -> None:
+    """Appends a block of values to the DataEcho object. The block is
+    written with at most two slice assignments per column, and the
+    callbacks are notified once for the whole block. Timestamps are given
+    in nanoseconds since the epoch of the MonotonicField. If no
+    timestamps are given, every value in the block receives the current
+    time. If the block is longer than the array, only the most recent
+    values are kept."""
+    values = np.asarray(values)
+    if np.iscomplexobj(values):
+      values = values.imag
+    values = values.astype(self.valueArray.dtype, copy=False).reshape(-1)
+    timeType = self.timeArray.dtype
+    if timestamps is None:
+      times = np.full(values.shape, self.rightNow, dtype=timeType)
+    else:
+      times = np.asarray(timestamps, dtype=timeType).reshape(-1)
+      if times.shape != values.shape:
+        e = """Received %d timestamps for %d values!"""
+        raise ValueError(e % (times.shape[0], values.shape[0]))
+    isNum = values == values
+    if not isNum.all():
+      values, times = values[isNum], times[isNum]
+    self._writeBlock(times, values)
+
+  def _writeBlock(self, times: np.ndarray, values: np.ndarray) -> None:
+    """Writes the block and notifies the callbacks once."""
+    if not values.shape[0]:
+      return
+    self._writeRing(times, values)
+    self.notifyCallbacks()
+
+  def _writeRing(self, times: np.ndarray, values: np.ndarray) -> None:
+    """Writes the block along the first axis of both columns with at most
+    two slice assignments per column."""
+    n, k = len(self), values.shape[0]
+    if self.__archive__ is not None or self.__stats__ is not None:
+      self._evict(times, values)
+    total = self.__total_count__ + k
+    start = self.__zero_index__
+    if k > n:
+      start = (start + k - n) % n
+      values, times, k = values[-n:], times[-n:], n
+    self.__sequence__ += 1
+    first = min(k, n - start)
+    self.timeArray[start:start + first] = times[:first]
+    self.valueArray[start:start + first] = values[:first]
+    if first < k:
+      self.timeArray[:k - first] = times[first:]
+      self.valueArray[:k - first] = values[first:]
+    self.__zero_index__ = (start + k) % n
+    self.__fill_count__ = min(self.__fill_count__ + k, n)
+    self.__total_count__ = total
+    self.__sequence__ += 1
+    if self.__pyramid__ is not None:
+      self.__pyramid__.update(total - k, values)
+    if self.__stats__ is not None:
+      oldest = total - self.__fill_count__
+      self.__stats__.add(total - k, values, oldest)
+      self._refreshStats()
+
+  def _evict(self, times: np.ndarray, values: np.ndarray) -> None:
+    """Moves the samples about to be overwritten by the block to the
+    archive and subtracts them from the running statistics. If the block
+    is longer than the array, its leading samples are archived as well,
+    as they never enter the ring."""
+    n, k = len(self), values.shape[0]
+    evicted = min(self.__fill_count__ + k - n, self.__fill_count__)
+    if evicted > 0:
+      oldest = self.__total_count__ - self.__fill_count__
+      timeHead, timeTail = self.timeSegments(oldest, oldest + evicted)
+      valueHead, valueTail = self.valueSegments(oldest, oldest + evicted)
+      if self.__archive__ is not None:
+        self.__archive__.append(timeHead, valueHead)
+        self.__archive__.append(timeTail, valueTail)
+      if self.__stats__ is not None:
+        self.__stats__.remove(valueHead)
+        self.__stats__.remove(valueTail)
+    if k > n and self.__archive__ is not None:
+      self.__archive__.append(times[:k - n], values[:k - n])
+
+  def _refreshStats(self, ) -> None:
+    """Recomputes the running sums once they have gone stale."""
+    if self.__stats__.isStale():
+      self.__stats__.refresh(*self.valueSegments())
 
   def __str__(self, ) -> str:
     line = []
     lines = []
-    for val in self.toArray():
-      this = '(%.3f + %.3fI)' % (val.real, val.imag)
+    for (t, val) in zip(self.readSeconds(), self.readValues()):
+      this = '(%.3f, %.3f)' % (t, val)
       if sum([len(x) for x in line]) + len(this) + 2 * len(line) + 1 > 77:
         lines.append(', '.join(line))
         line = []
@@ -98,12 +291,322 @@ class DataRoll:
 
   def __len__(self, ) -> int:
     """Returns the length of the array  ."""
-    return self.array.shape[0]
+    return self.timeArray.shape[0]
+
+  def count(self, ) -> int:
+    """Returns the number of samples currently held. This is at most the
+    length of the array."""
+    return self.__fill_count__
+
+  def totalCount(self, ) -> int:
+    """Returns the number of samples appended since creation. The most
+    recent sample has the absolute index one less than this."""
+    return self.__total_count__
+
+  def _segments(self,
+                array: np.ndarray,
+                start: int = None,
+                stop: int = None) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the held part of the given column as two views in
+    chronological order. If given, 'start' and 'stop' are absolute
+    indices limiting the range, and are clipped to the held samples."""
+    n, total = array.shape[0], self.__total_count__
+    oldest = total - self.__fill_count__
+    start = oldest if start is None else max(start, oldest)
+    stop = total if stop is None else min(stop, total)
+    if stop <= start:
+      return array[:0], array[:0]
+    first, count = start % n, stop - start
+    if first + count <= n:
+      return array[first:first + count], array[:0]
+    return array[first:], array[:first + count - n]
+
+  def timeSegments(self,
+                   start: int = None,
+                   stop: int = None) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the held timestamps as two views on the time column in
+    chronological order. The first view holds the oldest samples and the
+    second view holds the most recent. Neither view copies the underlying
+    buffer, so the views are only valid until the next append. The
+    optional absolute indices 'start' and 'stop' limit the range, for
+    example to the range passed to a subscriber."""
+    return self._segments(self.timeArray, start, stop)
+
+  def valueSegments(self,
+                    start: int = None,
+                    stop: int = None) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the held values as two views on the value column in
+    chronological order. The views are only valid until the next
+    append."""
+    return self._segments(self.valueArray, start, stop)
+
+  @staticmethod
+  def _readInto(head: np.ndarray,
+                tail: np.ndarray,
+                out: np.ndarray = None, ) -> np.ndarray:
+    """Writes the two segments into 'out' and returns a view of the
+    filled part. If 'out' is None, a new array is allocated."""
+    n = head.shape[0] + tail.shape[0]
+    if out is None:
+      out = np.empty((n, *head.shape[1:]), dtype=head.dtype)
+    elif not isinstance(out, np.ndarray):
+      e = typeMsg('out', out, np.ndarray)
+      raise TypeError(e)
+    elif out.shape[0] < n:
+      e = """The output buffer holds %d entries, but %d samples are 
+      available!""" % (out.shape[0], n)
+      raise ValueError(monoSpace(e))
+    out[:head.shape[0]] = head
+    out[head.shape[0]:n] = tail
+    return out[:n]
+
+  def readTimes(self, out: np.ndarray = None) -> np.ndarray:
+    """Returns the held timestamps in chronological order. If 'out' is
+    given, the timestamps are written into it and a view of the filled
+    part is returned, meaning that repeated reads into the same buffer do
+    not allocate."""
+    return self._readInto(*self.timeSegments(), out)
+
+  def readSeconds(self, out: np.ndarray = None) -> np.ndarray:
+    """Returns the held timestamps in chronological order converted to
+    seconds. If given, 'out' must be a floating point buffer."""
+    if out is None:
+      out = np.empty((self.__fill_count__,), dtype=np.float64)
+    times = self._readInto(*self.timeSegments(), out)
+    return self.toSeconds(times, times)
+
+  @staticmethod
+  def toSeconds(times: Any, out: np.ndarray = None) -> Any:
+    """Converts timestamps from the time column to seconds. If 'out' is
+    given, the result is written into it, which may be 'times' itself if
+    it is a floating point array."""
+    return MonotonicField.toSeconds(times, out)
+
+  def readValues(self, out: np.ndarray = None) -> np.ndarray:
+    """Returns the held values in chronological order. Supports an
+    output buffer in the same way as 'readTimes'."""
+    return self._readInto(*self.valueSegments(), out)
+
+  def _searchTime(self, t: int, side: str = 'left') -> int:
+    """Returns the absolute index at which 't' would be inserted in the
+    held timestamps, found by binary search on the two segments."""
+    head, tail = self.timeSegments()
+    oldest = self.__total_count__ - self.__fill_count__
+    index = int(np.searchsorted(head, t, side))
+    if index < head.shape[0] or not tail.shape[0]:
+      return oldest + index
+    return oldest + index + int(np.searchsorted(tail, t, side))
+
+  def window(self,
+             t0: int = None,
+             t1: int = None) -> tuple[tuple[np.ndarray, np.ndarray], ...]:
+    """Returns the held samples with timestamps from 't0' to 't1', both
+    included, as the pairs of segment views (timeHead, timeTail) and
+    (valueHead, valueTail). The bounds are located by binary search, so
+    the cost does not depend on the number of samples held. Like the
+    segments, the views are only valid until the next append."""
+    oldest = self.__total_count__ - self.__fill_count__
+    start = oldest if t0 is None else self._searchTime(t0, 'left')
+    stop = None if t1 is None else self._searchTime(t1, 'right')
+    return self.timeSegments(start, stop), self.valueSegments(start, stop)
+
+  def last(self, seconds: float) -> tuple[tuple[np.ndarray, ...], ...]:
+    """Returns the samples from the given number of seconds before the
+    most recent sample as segment views in the same way as 'window'."""
+    if not self.__fill_count__:
+      return self.window()
+    newest = int(self.timeArray[(self.__zero_index__ - 1) % len(self)])
+    return self.window(newest - int(round(seconds * 1e9)), None)
+
+  def enablePyramid(self, ) -> DataPyramid:
+    """Enables the multi-resolution summary of the values. The pyramid is
+    seeded with the samples already held and is then updated by every
+    append."""
+    if self.__pyramid__ is None:
+      channels = self.valueArray.shape[1:]
+      self.__pyramid__ = DataPyramid(len(self), channels)
+      oldest = self.__total_count__ - self.__fill_count__
+      self.__pyramid__.update(oldest, self.readValues())
+    return self.__pyramid__
+
+  def enableArchive(self,
+                    directory: str,
+                    chunkLength: int = None) -> DataArchive:
+    """Enables the archive, after which samples evicted from the ring are
+    appended to memory mapped chunk files in the given directory. Samples
+    evicted before the archive was enabled are not recovered."""
+    if self.__archive__ is None:
+      oldest = self.__total_count__ - self.__fill_count__
+      self.__archive__ = DataArchive(directory,
+                                     chunkLength,
+                                     self.timeArray.dtype,
+                                     self.valueArray.dtype,
+                                     self.valueArray.shape[1:],
+                                     oldest)
+    return self.__archive__
+
+  def enableStats(self, ) -> RunningStats:
+    """Enables the running statistics of the held values, seeding them
+    with the samples already held. Once enabled, every append updates
+    them in time proportional to the number of samples appended."""
+    if self.__stats__ is None:
+      self.__stats__ = RunningStats(len(self))
+      oldest = self.__total_count__ - self.__fill_count__
+      self.__stats__.add(oldest, self.readValues(), oldest)
+    return self.__stats__
+
+  @property
+  def stats(self, ) -> RunningStats:
+    """Returns the running statistics, enabling them on first access."""
+    return self.enableStats()
+
+  @property
+  def minimum(self, ) -> float:
+    """Returns the least value held."""
+    return self.stats.minimum
+
+  @property
+  def maximum(self, ) -> float:
+    """Returns the greatest value held."""
+    return self.stats.maximum
+
+  @property
+  def mean(self, ) -> float:
+    """Returns the mean of the values held."""
+    return self.stats.mean
+
+  @property
+  def variance(self, ) -> float:
+    """Returns the population variance of the values held."""
+    return self.stats.variance
+
+  def _searchHistory(self, t: int, side: str = 'left') -> int:
+    """Returns the absolute index at which 't' would be inserted in the
+    archived and held timestamps combined."""
+    archive = self.__archive__
+    if archive is not None and len(archive):
+      index = archive.searchTime(t, side)
+      if index < archive.stopIndex:
+        return index
+    return self._searchTime(t, side)
+
+  def readHistory(self,
+                  start: int,
+                  stop: int = None) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the times and values from absolute index 'start' up to
+    'stop', combining the archive with the samples held in the ring. The
+    range is clipped to the available samples."""
+    stop = self.__total_count__ if stop is None else stop
+    oldest = self.__total_count__ - self.__fill_count__
+    timeHead, timeTail = self.timeSegments(max(start, oldest), stop)
+    valueHead, valueTail = self.valueSegments(max(start, oldest), stop)
+    if self.__archive__ is None or start >= oldest:
+      times = self._readInto(timeHead, timeTail)
+      return times, self._readInto(valueHead, valueTail)
+    times, values = self.__archive__.read(start, min(stop, oldest))
+    return (np.concatenate((times, timeHead, timeTail)),
+            np.concatenate((values, valueHead, valueTail)))
+
+  def history(self,
+              t0: int = None,
+              t1: int = None) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the times and values from 't0' to 't1', including samples
+    moved to the archive. Only the requested window is read from disk."""
+    start = 0 if t0 is None else self._searchHistory(t0, 'left')
+    stop = None if t1 is None else self._searchHistory(t1, 'right')
+    return self.readHistory(start, stop)
+
+  def summarize(self,
+                width: int,
+                t0: int = None,
+                t1: int = None) -> tuple[np.ndarray, ...]:
+    """Returns timestamps with the min, max and mean values of the samples
+    between 't0' and 't1' at a resolution of about 'width' buckets. With
+    the pyramid enabled, the cost is proportional to the number of
+    buckets returned, regardless of the span. Otherwise the samples are
+    reduced directly. If the span holds few enough samples, they are
+    returned as they are, with the min, max and mean all equal to the
+    values."""
+    total = self.__total_count__
+    start = self.__total_count__ - self.__fill_count__
+    if t0 is not None:
+      start = self._searchTime(t0, 'left')
+    stop = total if t1 is None else self._searchTime(t1, 'right')
+    span = max(stop - start, 0)
+    if self.__pyramid__ is not None:
+      level = self.__pyramid__.chooseLevel(span, width)
+      if level >= 0:
+        first, mins, maxs, means = self.__pyramid__.read(level, start, stop)
+        times = self.timeArray[first % len(self)]
+        return times, mins, maxs, means
+    times = self._readInto(*self.timeSegments(start, stop))
+    values = self._readInto(*self.valueSegments(start, stop))
+    if span <= 2 * width:
+      return times, values, values, values
+    cuts = np.linspace(0, span, width, endpoint=False).astype(np.int64)
+    mins = np.minimum.reduceat(values, cuts, axis=0)
+    maxs = np.maximum.reduceat(values, cuts, axis=0)
+    means = np.add.reduceat(values, cuts, axis=0)
+    counts = np.diff(np.append(cuts, span))
+    means /= counts.reshape((-1,) + (1,) * (means.ndim - 1))
+    return times[cuts], mins, maxs, means
+
+  @property
+  def sequence(self, ) -> int:
+    """Returns the sequence counter. The counter is odd while a write is
+    in progress and changes with every write."""
+    return self.__sequence__
+
+  def readBegin(self, ) -> int:
+    """Returns the sequence counter to be passed to 'readValid' once the
+    reader has finished with the views. Every write increments the counter
+    before and after touching the columns, so it is odd while a write is
+    in progress, in which case a negative value is returned and the reader
+    should try again. This lets a single consumer thread read while a
+    single producer thread appends, without the producer taking a
+    lock."""
+    sequence = self.__sequence__
+    return -1 if sequence % 2 else sequence
+
+  def readValid(self, sequence: int) -> bool:
+    """Returns True if no write happened since 'readBegin' returned the
+    given sequence counter, meaning the views read in between were not
+    torn by the producer."""
+    return True if sequence >= 0 and sequence == self.__sequence__ else False
+
+  def snapshot(self,
+               timeOut: np.ndarray = None,
+               valueOut: np.ndarray = None, ) -> tuple[Any, Any]:
+    """Copies a consistent snapshot of the held samples into the given
+    buffers and returns views of the filled parts, wrapping 'readBegin'
+    and 'readValid'. Multiple producers must serialize their appends
+    themselves, and as the columns are allocated on first access, the
+    roll should be read once before the producer starts. Torn reads are
+    retried up to a fixed number of times before raising a RuntimeError.
+    The thread yields after every failed attempt, giving the producer the
+    chance to finish its write before the next attempt."""
+    for _ in range(self.__max_retries__):
+      sequence = self.readBegin()
+      if sequence >= 0:
+        times = self.readTimes(timeOut)
+        values = self.readValues(valueOut)
+        if self.readValid(sequence):
+          return times, values
+      time.sleep(0)
+    e = """Unable to read a consistent snapshot after %d attempts, as the
+    writer kept updating the roll!"""
+    raise RuntimeError(monoSpace(e % self.__max_retries__))
 
-  def toArray(self, ) -> np.ndarray:
-    """Returns the array."""
-    arr = np.roll(self.array, -self.__zero_index__)
-    return arr[~np.isnan(arr)]
+  def toArray(self, out: np.ndarray = None) -> np.ndarray:
+    """Returns the held samples in chronological order as a complex array
+    with the timestamps in the real part and the values in the imaginary
+    part. Prefer 'readTimes' and 'readValues' which avoid the packing."""
+    n = self.__fill_count__
+    if out is None:
+      out = np.empty((n,), dtype=complex)
+    self.readSeconds(out.real)
+    self.readValues(out.imag)
+    return out[:n]
 
   @classmethod
   def getDefault(cls, *args, **kwargs) -> DataRoll:
@@ -117,6 +620,12 @@ class DataRoll:
     for arg in args:
       if isinstance(arg, int):
         self.arrayLength = arg
+    if kwargs.get('pyramid', False):
+      self.enablePyramid()
+    if kwargs.get('archive', None) is not None:
+      self.enableArchive(kwargs['archive'])
+    if kwargs.get('stats', False):
+      self.enableStats()
     return self
 
 
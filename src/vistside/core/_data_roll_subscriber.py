@@ -0,0 +1,65 @@
+"""DataRollSubscriber wraps a callback registered on a DataRoll and keeps
+track of which samples it has been notified of."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+from typing import Callable
+
+from vistutils.waitaminute import typeMsg
+
+
+class DataRollSubscriber:
+  """DataRollSubscriber wraps a callback registered on a DataRoll. The
+  callback receives the absolute indices (start, stop) of the samples
+  appended since its previous notification. If a minimum interval is
+  given, the subscriber is notified at most once per interval, and the
+  samples appended in the meantime are included in the next range."""
+
+  __callback_function__ = None
+  __min_interval__ = None
+  __next_index__ = None
+  __last_call__ = None
+
+  def __init__(self,
+               callMeMaybe: Callable,
+               minInterval: float = None,
+               startIndex: int = None) -> None:
+    if not callable(callMeMaybe):
+      e = typeMsg('callMeMaybe', callMeMaybe, Callable)
+      raise TypeError(e)
+    if minInterval is not None and not isinstance(minInterval, (int, float)):
+      e = typeMsg('minInterval', minInterval, float)
+      raise TypeError(e)
+    self.__callback_function__ = callMeMaybe
+    self.__min_interval__ = float(minInterval or 0)
+    self.__next_index__ = startIndex or 0
+    self.__last_call__ = None
+
+  def __call__(self, *args, **kwargs) -> None:
+    """Calls the callback directly."""
+    return self.__callback_function__(*args, **kwargs)
+
+  def getCallback(self, ) -> Callable:
+    """Getter-function for the wrapped callback."""
+    return self.__callback_function__
+
+  def remaining(self, now: float) -> float:
+    """Returns the number of seconds until the subscriber may be notified
+    again."""
+    if self.__last_call__ is None:
+      return 0.0
+    return max(0.0, self.__min_interval__ - (now - self.__last_call__))
+
+  def offer(self, stop: int, now: float) -> bool:
+    """Notifies the callback of the samples from its next index up to
+    'stop' unless its rate limit forbids it. Returns True if samples
+    remain undelivered."""
+    if self.__next_index__ >= stop:
+      return False
+    if self.remaining(now) > 0:
+      return True
+    start, self.__next_index__ = self.__next_index__, stop
+    self.__last_call__ = now
+    self.__callback_function__(start, stop)
+    return False
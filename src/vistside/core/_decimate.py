@@ -0,0 +1,139 @@
+"""The decimate functions reduce a series to a number of points set by the
+pixel width it is to be rendered at."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+import numpy as np
+from vistutils.waitaminute import typeMsg
+
+from vistside.core import DecimationMode
+
+
+def _validateWidth(width: int) -> int:
+  """Validates the pixel width."""
+  if isinstance(width, float):
+    width = int(width)
+  if not isinstance(width, int):
+    e = typeMsg('width', width, int)
+    raise TypeError(e)
+  return max(width, 1)
+
+
+def decimateMinMax(x: np.ndarray,
+                   y: np.ndarray,
+                   width: int) -> tuple[np.ndarray, np.ndarray]:
+  """Splits the span of 'x' into 'width' equally wide columns and keeps
+  the minimum and the maximum of 'y' in each column, in their original
+  order. The result holds at most 2 * width points. The x-values must be
+  sorted and the y-values must be finite. The column starts are found by
+  binary search and no temporary array grows with the length of the
+  series beyond the square root of its product with the width."""
+  width = _validateWidth(width)
+  n = x.shape[0]
+  if n <= 2 * width:
+    return x, y
+  edges = np.linspace(x[0], x[-1], width + 1)[1:-1]
+  starts = np.empty((width,), dtype=np.int64)
+  starts[0] = 0
+  starts[1:] = np.searchsorted(x, edges, 'right')
+  starts = _sortedUnique(starts)
+  lowIndex, highIndex = _extremeIndices(y, starts[starts < n])
+  index = np.empty((2 * lowIndex.shape[0],), dtype=np.int64)
+  index[0::2] = np.minimum(lowIndex, highIndex)
+  index[1::2] = np.maximum(lowIndex, highIndex)
+  return x[index], y[index]
+
+
+def _sortedUnique(values: np.ndarray) -> np.ndarray:
+  """Returns the distinct values in ascending order."""
+  values = np.sort(values)
+  isNew = np.empty(values.shape, dtype=bool)
+  isNew[0] = True
+  np.not_equal(values[1:], values[:-1], out=isNew[1:])
+  return values[isNew]
+
+
+def _extremeIndices(y: np.ndarray,
+                    starts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+  """Returns the index of the first minimum and of the first maximum of
+  'y' in each segment beginning at 'starts'. The segments are split
+  further at every multiple of a block length, so that each piece lies
+  in a single block. The extremes of the pieces locate the block holding
+  the extreme of each segment, which is then searched sample by
+  sample."""
+  n = y.shape[0]
+  block = max(int(4 * (n / starts.shape[0]) ** 0.5), 1)
+  pieces = _sortedUnique(np.concatenate((starts, np.arange(0, n, block))))
+  pieceSegment = np.searchsorted(starts, pieces, 'right') - 1
+  firstPiece = np.searchsorted(pieces, starts)
+  offsets = np.arange(block)
+  out = []
+  for reduce in (np.minimum, np.maximum):
+    pieceValues = reduce.reduceat(y, pieces)
+    values = reduce.reduceat(pieceValues, firstPiece)
+    isBest = pieceValues == values[pieceSegment]
+    best = pieces[_firstMatch(isBest, pieceSegment)]
+    window = np.minimum(best.reshape(-1, 1) + offsets, n - 1)
+    isMatch = y[window] == values.reshape(-1, 1)
+    out.append(best + np.argmax(isMatch, axis=1))
+  return out[0], out[1]
+
+
+def _firstMatch(isMatch: np.ndarray, column: np.ndarray) -> np.ndarray:
+  """Returns for each column the index of the first sample flagged in
+  'isMatch'. Every column must contain at least one flagged sample."""
+  matches = np.flatnonzero(isMatch)
+  matchColumn = column[matches]
+  isFirst = np.empty(matches.shape, dtype=bool)
+  isFirst[0] = True
+  np.not_equal(matchColumn[1:], matchColumn[:-1], out=isFirst[1:])
+  return matches[isFirst]
+
+
+def decimateLTTB(x: np.ndarray,
+                 y: np.ndarray,
+                 width: int) -> tuple[np.ndarray, np.ndarray]:
+  """Reduces the series to about 2 * width points using a variant of the
+  Largest Triangle Three Buckets algorithm. The series is first reduced
+  with 'decimateMinMax' at twice the width. Each bucket then keeps the
+  point forming the largest triangle with the means of the neighbouring
+  buckets, rather than with the point chosen in the previous bucket, so
+  every bucket is scored at once."""
+  width = _validateWidth(width)
+  x, y = decimateMinMax(x, y, 2 * width)
+  threshold = 2 * width
+  n = x.shape[0]
+  if n <= threshold or threshold < 3:
+    return x, y
+  edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+  counts = np.diff(edges)
+  meanX = np.add.reduceat(x[:-1], edges[:-1]) / counts
+  meanY = np.add.reduceat(y[:-1], edges[:-1]) / counts
+  leftX, leftY = np.append(x[0], meanX[:-1]), np.append(y[0], meanY[:-1])
+  rightX, rightY = np.append(meanX[1:], x[-1]), np.append(meanY[1:], y[-1])
+  bucket = np.repeat(np.arange(threshold - 2), counts)
+  ax, ay = leftX[bucket], leftY[bucket]
+  dx, dy = rightX[bucket] - ax, rightY[bucket] - ay
+  area = np.abs(dx * (y[1:-1] - ay) - dy * (x[1:-1] - ax))
+  largest = np.maximum.reduceat(area, edges[:-1] - 1)
+  index = np.empty((threshold,), dtype=np.int64)
+  index[0], index[-1] = 0, n - 1
+  index[1:-1] = 1 + _firstMatch(area == largest[bucket], bucket)
+  return x[index], y[index]
+
+
+def decimate(x: np.ndarray,
+             y: np.ndarray,
+             width: int,
+             mode: DecimationMode = None) -> tuple[np.ndarray, np.ndarray]:
+  """Reduces the series to at most about 2 * width points using the given
+  mode. Defaults to DecimationMode.MINMAX."""
+  if mode is None or mode is DecimationMode.MINMAX:
+    return decimateMinMax(x, y, width)
+  if mode is DecimationMode.LTTB:
+    return decimateLTTB(x, y, width)
+  if mode is DecimationMode.NONE:
+    return x, y
+  e = typeMsg('mode', mode, DecimationMode)
+  raise TypeError(e)
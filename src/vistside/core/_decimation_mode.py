@@ -0,0 +1,16 @@
+"""DecimationMode specifies how a series is reduced before rendering"""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+from enum import Enum
+
+
+class DecimationMode(Enum):
+  """Specifies how a series is reduced to the pixel width it is rendered
+  at. MINMAX keeps the extremes of each pixel column. LTTB keeps the
+  points spanning the largest triangles. NONE keeps every point."""
+
+  NONE = 0
+  MINMAX = 1
+  LTTB = 2
@@ -0,0 +1,16 @@
+"""DispatchMode specifies when a DataRoll notifies its subscribers"""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+from enum import Enum
+
+
+class DispatchMode(Enum):
+  """Specifies when a DataRoll notifies its subscribers. IMMEDIATE
+  notifies on every append. INTERVAL notifies at most once per dispatch
+  interval. FRAME notifies once per turn of the Qt event loop."""
+
+  IMMEDIATE = 0
+  INTERVAL = 1
+  FRAME = 2
@@ -0,0 +1,98 @@
+"""FilterChain filters the samples appended to a DataRoll through a
+sequence of stages and appends the result to a derived DataRoll."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+import warnings
+from typing import Any
+
+from vistutils.text import monoSpace
+from vistutils.waitaminute import typeMsg
+
+from vistside.core import DataRoll, MultiDataRoll
+
+
+class FilterChain:
+  """FilterChain filters the samples appended to a source DataRoll
+  through a sequence of stages and appends the result to a derived
+  DataRoll with the same timestamps. A stage is any object with a
+  'process' method taking a block of values and returning the filtered
+  block, such as FirFilter and IirFilter, which keep their state between
+  blocks. Each sample is therefore filtered exactly once, when it is
+  appended, and the cost is linear in the new data rather than the
+  length of the roll.
+
+  Unless a target is given, the derived roll has the length of the
+  source, and the channel count too if the source is a MultiDataRoll.
+  NaN values kept by a MultiDataRoll propagate through recursive stages,
+  so missing values should be filled before filtering.
+
+  If samples are overwritten in the source before the callback reads
+  them, for example by a block longer than the roll or by a delayed
+  dispatch, the stages are reset with a RuntimeWarning rather than
+  carrying their state across the gap. Enabling the archive on the
+  source lets the chain read such samples from disk instead."""
+
+  __source__ = None
+  __target__ = None
+  __stages__ = None
+
+  def __init__(self,
+               source: DataRoll,
+               *stages,
+               target: DataRoll = None) -> None:
+    if not isinstance(source, DataRoll):
+      e = typeMsg('source', source, DataRoll)
+      raise TypeError(e)
+    for stage in stages:
+      if not callable(getattr(stage, 'process', None)):
+        e = """Expected a filter stage with a 'process' method, but
+        received: '%s'!"""
+        raise TypeError(monoSpace(e % stage))
+    if target is None:
+      if isinstance(source, MultiDataRoll):
+        target = MultiDataRoll.getDefault(len(source), source.channelCount)
+      else:
+        target = DataRoll.getDefault(len(source))
+    elif not isinstance(target, DataRoll):
+      e = typeMsg('target', target, DataRoll)
+      raise TypeError(e)
+    self.__source__ = source
+    self.__target__ = target
+    self.__stages__ = [*stages]
+    source.appendCallback(self.update)
+
+  @property
+  def target(self, ) -> DataRoll:
+    """Returns the derived DataRoll receiving the filtered samples."""
+    return self.__target__
+
+  def appendStage(self, stage: Any) -> None:
+    """Appends a stage to the end of the chain. It filters only samples
+    appended from now on."""
+    self.__stages__.append(stage)
+
+  def reset(self, ) -> None:
+    """Clears the state of every stage."""
+    for stage in self.__stages__:
+      if callable(getattr(stage, 'reset', None)):
+        stage.reset()
+
+  def update(self, start: int, stop: int) -> None:
+    """Filters the samples from absolute index 'start' up to 'stop' and
+    appends them to the target. This is the callback registered on the
+    source. If some of the samples are no longer available, the stages
+    are reset before filtering the rest."""
+    times, values = self.__source__.readHistory(start, stop)
+    if times.shape[0] < stop - start:
+      e = """The filter chain missed %d samples overwritten in the source
+      before they were filtered, and the stages were reset!"""
+      missed = stop - start - times.shape[0]
+      warnings.warn(monoSpace(e % missed), RuntimeWarning, stacklevel=2)
+      self.reset()
+    if not times.shape[0]:
+      return
+    for stage in self.__stages__:
+      values = stage.process(values)
+    self.__target__.appendMany(values, times)
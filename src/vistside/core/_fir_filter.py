@@ -0,0 +1,50 @@
+"""FirFilter applies a finite impulse response filter to a stream of
+blocks, keeping the tail of each block for the next."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from vistutils.text import monoSpace
+
+
+class FirFilter:
+  """FirFilter applies a finite impulse response filter to a stream of
+  blocks. The last len(taps) - 1 inputs are kept between blocks, so
+  filtering a stream block by block gives the same result as filtering
+  it in one piece. Blocks may have any number of channels along the
+  second axis."""
+
+  __taps__ = None
+  __tail__ = None
+
+  def __init__(self, taps: Any) -> None:
+    taps = np.asarray(taps, dtype=np.float64).reshape(-1)
+    if not taps.shape[0]:
+      e = """A FirFilter requires at least one tap!"""
+      raise ValueError(monoSpace(e))
+    self.__taps__ = taps
+
+  @classmethod
+  def movingAverage(cls, length: int) -> FirFilter:
+    """Returns a filter averaging the most recent 'length' samples."""
+    return cls(np.full((length,), 1.0 / length))
+
+  def reset(self, ) -> None:
+    """Clears the kept inputs."""
+    self.__tail__ = None
+
+  def process(self, values: np.ndarray) -> np.ndarray:
+    """Filters the block and returns the output of the same shape."""
+    m = self.__taps__.shape[0]
+    if self.__tail__ is None:
+      self.__tail__ = np.zeros((m - 1, *values.shape[1:]))
+    padded = np.concatenate((self.__tail__, values))
+    self.__tail__ = padded[padded.shape[0] - m + 1:]
+    if values.ndim == 1:
+      return np.convolve(padded, self.__taps__, 'valid')
+    windows = sliding_window_view(padded, m, axis=0)
+    return windows @ self.__taps__[::-1]
@@ -0,0 +1,83 @@
+"""IirFilter applies an infinite impulse response filter to a stream of
+blocks, keeping the delay line between blocks."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+from vistutils.text import monoSpace
+
+try:
+  from scipy.signal import lfilter
+except ImportError:
+  lfilter = None
+
+
+class IirFilter:
+  """IirFilter applies an infinite impulse response filter with the
+  numerator 'b' and denominator 'a' to a stream of blocks. The delay line
+  of the transposed direct form is kept between blocks, so filtering a
+  stream block by block gives the same result as filtering it in one
+  piece. Blocks may have any number of channels along the second axis.
+
+  If scipy is available, each block is filtered by 'lfilter'. Otherwise
+  the recursion runs in a Python loop over the samples, vectorised only
+  across channels, which is much slower for long blocks."""
+
+  __b__ = None
+  __a__ = None
+  __state__ = None
+
+  def __init__(self, b: Any, a: Any = None) -> None:
+    b = np.asarray(b, dtype=np.float64).reshape(-1)
+    a = np.ones((1,)) if a is None else np.asarray(a, dtype=np.float64)
+    a = a.reshape(-1)
+    if not b.shape[0] or not a.shape[0] or a[0] == 0:
+      e = """An IirFilter requires a non-empty numerator and a denominator
+      with a non-zero leading coefficient!"""
+      raise ValueError(monoSpace(e))
+    n = max(b.shape[0], a.shape[0])
+    self.__b__ = np.pad(b, (0, n - b.shape[0])) / a[0]
+    self.__a__ = np.pad(a, (0, n - a.shape[0])) / a[0]
+
+  @classmethod
+  def onePoleLowPass(cls, alpha: float) -> IirFilter:
+    """Returns the exponential smoothing filter y += alpha * (x - y)."""
+    return cls([alpha], [1.0, alpha - 1.0])
+
+  @classmethod
+  def dcBlocker(cls, pole: float = 0.995) -> IirFilter:
+    """Returns a filter removing the constant and slowly drifting part of
+    the signal. The closer the pole is to 1, the lower the cutoff."""
+    return cls([1.0, -1.0], [1.0, -pole])
+
+  def reset(self, ) -> None:
+    """Clears the delay line."""
+    self.__state__ = None
+
+  def process(self, values: np.ndarray) -> np.ndarray:
+    """Filters the block and returns the output of the same shape."""
+    if self.__state__ is None:
+      shape = (self.__b__.shape[0] - 1, *values.shape[1:])
+      self.__state__ = np.zeros(shape)
+    if lfilter is not None:
+      out, self.__state__ = lfilter(self.__b__, self.__a__, values,
+                                    axis=0, zi=self.__state__)
+      return out
+    return self._processLoop(values)
+
+  def _processLoop(self, values: np.ndarray) -> np.ndarray:
+    """Runs the transposed direct form recursion sample by sample."""
+    b, a, z = self.__b__, self.__a__, self.__state__
+    out = np.empty(values.shape, dtype=np.float64)
+    order = z.shape[0]
+    for (i, x) in enumerate(values):
+      y = b[0] * x + (z[0] if order else 0.0)
+      for j in range(order - 1):
+        z[j] = b[j + 1] * x + z[j + 1] - a[j + 1] * y
+      if order:
+        z[order - 1] = b[order] * x - a[order] * y
+      out[i] = y
+    return out
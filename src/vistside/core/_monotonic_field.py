@@ -0,0 +1,51 @@
+"""The MonotonicField provides a StaticField returning the integer number
+of nanoseconds elapsed since an epoch shared by the whole process."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+import time
+from typing import Any
+
+import numpy as np
+from vistutils.fields import StaticField
+
+
+class MonotonicField(StaticField):
+  """The MonotonicField provides a StaticField returning the integer number
+  of nanoseconds elapsed since the epoch the moment the __getter__ is
+  invoked. If accessed on the owner class, the descriptor returns itself.
+
+  The clock is 'time.perf_counter_ns', which never jumps with adjustments
+  of the system clock. The epoch is recorded once when the module is
+  imported and is shared by every owner class, so timestamps taken by
+  different classes can be compared and merged exactly."""
+
+  __epoch__ = time.perf_counter_ns()
+
+  def __init__(self, *args, **kwargs) -> None:
+    StaticField.__init__(self, None)
+
+  def __get__(self, instance: object, owner: type) -> Any:
+    """Getter-function implementation."""
+    if instance is None:
+      return self
+    return time.perf_counter_ns() - MonotonicField.__epoch__
+
+  @staticmethod
+  def epoch() -> int:
+    """Returns the process-wide epoch as a reading of the clock."""
+    return MonotonicField.__epoch__
+
+  @staticmethod
+  def now() -> int:
+    """Returns the nanoseconds elapsed since the epoch."""
+    return time.perf_counter_ns() - MonotonicField.__epoch__
+
+  @staticmethod
+  def toSeconds(times: Any, out: np.ndarray = None) -> Any:
+    """Converts nanoseconds to seconds. If 'out' is given, the result is
+    written into it."""
+    if out is None:
+      return np.multiply(times, 1e-9)
+    return np.multiply(times, 1e-9, out=out)
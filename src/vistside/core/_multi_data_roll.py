@@ -0,0 +1,124 @@
+"""MultiDataRoll holds several channels sharing one time base in a single
+two-dimensional ring buffer."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+from vistutils.fields import unParseArgs, Wait, IntField
+from vistutils.text import stringList, monoSpace
+from vistutils.waitaminute import typeMsg
+
+from vistside.core import ArrayField, DataRoll, RunningStats
+
+
+class MultiDataRoll(DataRoll):
+  """MultiDataRoll holds several channels sharing one time base. The
+  timestamps are kept in a single column, while the values are kept in an
+  array of shape (arrayLength, channelCount). Appending a row writes one
+  timestamp and every channel at once, so the per-sample overhead is paid
+  once per row rather than once per channel."""
+
+  valueArray = ArrayField(dtype=np.float64, channels=True)
+  channelCount = IntField(1)
+
+  def append(self, value: Any = None) -> None:
+    """Appends a single row holding one value for each channel."""
+    self.appendMany(np.reshape(value, (1, -1)))
+
+  def appendMany(self, values: Any, timestamps: Any = None) -> None:
+    """Appends a block of rows of shape (k, channelCount). If no
+    timestamps are given, every row receives the current time. Unlike the
+    single channel roll, rows containing NaN are kept, as NaN marks a
+    missing value in that channel only."""
+    values = np.asarray(values, dtype=self.valueArray.dtype)
+    if values.ndim == 1:
+      values = values.reshape((1, -1))
+    if values.ndim != 2 or values.shape[1] != self.channelCount:
+      e = """Expected rows of %d channels, but received an array of shape
+      %s!"""
+      raise ValueError(monoSpace(e % (self.channelCount, values.shape)))
+    timeType = self.timeArray.dtype
+    if timestamps is None:
+      times = np.full((values.shape[0],), self.rightNow, dtype=timeType)
+    else:
+      times = np.asarray(timestamps, dtype=timeType).reshape(-1)
+      if times.shape[0] != values.shape[0]:
+        e = """Received %d timestamps for %d rows!"""
+        raise ValueError(e % (times.shape[0], values.shape[0]))
+    self._writeBlock(times, values)
+
+  def _getChannelIndex(self, index: int) -> int:
+    """Validates the channel index."""
+    if not isinstance(index, int):
+      e = typeMsg('index', index, int)
+      raise TypeError(e)
+    if -self.channelCount <= index < self.channelCount:
+      return index % self.channelCount
+    e = """Channel index %d is out of range for %d channels!"""
+    raise IndexError(e % (index, self.channelCount))
+
+  def channelSegments(self, index: int) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the held values of the given channel as two views in
+    chronological order. The views are strided columns of the value
+    array and copy nothing. They are only valid until the next append."""
+    index = self._getChannelIndex(index)
+    head, tail = self.valueSegments()
+    return head[:, index], tail[:, index]
+
+  def readChannel(self, index: int, out: np.ndarray = None) -> np.ndarray:
+    """Returns the held values of the given channel in chronological order
+    as a contiguous array. Supports an output buffer in the same way as
+    'readTimes'."""
+    return self._readInto(*self.channelSegments(index), out)
+
+  def enableStats(self, ) -> RunningStats:
+    """Running statistics are only maintained for a single channel. Use
+    'summarize' or read the channel instead."""
+    e = """Running statistics are not available on a MultiDataRoll!"""
+    raise TypeError(e)
+
+  def __str__(self, ) -> str:
+    lines = []
+    for (t, row) in zip(self.readSeconds(), self.readValues()):
+      lines.append('%.3f: %s' % (t, ', '.join('%.3f' % v for v in row)))
+    return '\n'.join(lines)
+
+  @classmethod
+  def getDefault(cls, *args, **kwargs) -> MultiDataRoll:
+    """Returns the default value for the field."""
+    dataRoll = cls()
+    return dataRoll.apply((args, kwargs))
+
+  def apply(self, value: Any) -> MultiDataRoll:
+    """Applies the value to the field. The first integer sets the length
+    and the second sets the number of channels."""
+    args, kwargs = unParseArgs(value)
+    intArgs = [arg for arg in args if isinstance(arg, int)]
+    if intArgs:
+      self.arrayLength = intArgs[0]
+    if len(intArgs) > 1:
+      self.channelCount = intArgs[1]
+    channelKeys = stringList("""channels, channelCount, numChannels""")
+    for key in channelKeys:
+      if key in kwargs:
+        val = kwargs.get(key)
+        if isinstance(val, int):
+          self.channelCount = val
+          break
+        e = typeMsg(key, val, int)
+        raise TypeError(e)
+    if kwargs.get('pyramid', False):
+      self.enablePyramid()
+    if kwargs.get('archive', None) is not None:
+      self.enableArchive(kwargs['archive'])
+    return self
+
+
+class MultiDataRollField(Wait):
+  """Wraps the MultiDataRoll in a mutable descriptor class"""
+
+  def __init__(self, *args, **kwargs) -> None:
+    Wait.__init__(self, MultiDataRoll, *args, **kwargs)
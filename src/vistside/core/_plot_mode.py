@@ -0,0 +1,17 @@
+"""PlotMode specifies how DataPaint draws the data"""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+from enum import Enum
+
+
+class PlotMode(Enum):
+  """Specifies how DataPaint draws the data. POINTS draws each sample as
+  a point. LINES connects consecutive samples with straight lines. STEPS
+  holds each value until the next sample, drawing a horizontal line
+  followed by a vertical line."""
+
+  POINTS = 0
+  LINES = 1
+  STEPS = 2
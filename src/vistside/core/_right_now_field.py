@@ -1,21 +1,25 @@
 """The RightNowField provides a StaticField return the epoch the moment
 the __getter__ is invoked. If accessed on the owner class, the descriptor
-returns itself, if accessed on any instance, it returns the time. """
+returns itself, if accessed on any instance, it returns the time in
+seconds since the process-wide epoch of the MonotonicField. """
 #  MIT Licence
 #  Copyright (c) 2024 Asger Jon Vistisen
 from __future__ import annotations
 
-import time
 from typing import Any
 
 from vistutils.fields import StaticField
-from vistutils.waitaminute import typeMsg
+
+from vistside.core import MonotonicField
 
 
 class RightNowField(StaticField):
   """The RightNowField provides a StaticField return the epoch the moment
     the __getter__ is invoked. If accessed on the owner class, the descriptor
-    returns itself, if accessed on any instance, it returns the time. """
+    returns itself, if accessed on any instance, it returns the time in
+    seconds since the process-wide epoch of the MonotonicField. Unlike
+    the wall clock, this time never jumps and is shared by every owner
+    class."""
 
   def __init__(self, *args, **kwargs) -> None:
     StaticField.__init__(self, None)
@@ -24,16 +28,4 @@ class RightNowField(StaticField):
     """Getter-function implementation."""
     if instance is None:
       return self
-    if getattr(owner, '__zero_time__', None) is None:
-      e = """The owner class does not have a __zero_time__ attribute!"""
-      raise AttributeError(e)
-    zeroTime = getattr(owner, '__zero_time__')
-    if isinstance(zeroTime, float):
-      return time.time() - zeroTime
-    e = typeMsg('zeroTime', zeroTime, float)
-    raise TypeError(e)
-
-  def __set_name__(self, owner: type, name: str) -> None:
-    """Invoked automatically when the owner class is created."""
-    StaticField.__set_name__(self, owner, name)
-    setattr(owner, '__zero_time__', time.time())
+    return MonotonicField.now() * 1e-9
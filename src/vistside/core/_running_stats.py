@@ -0,0 +1,195 @@
+"""RunningStats maintains the count, sum, sum of squares, minimum and
+maximum of the samples held by a DataRoll."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+import numpy as np
+from vistutils.waitaminute import typeMsg
+
+
+class _MonotonicQueue:
+  """Holds the absolute indices and values of the samples that may still
+  become the minimum of the window, in increasing order of both. The
+  maximum is tracked by a queue of negated values."""
+
+  def __init__(self, capacity: int, sign: float) -> None:
+    self.sign = sign
+    self.indices = np.empty((2 * capacity + 1,), dtype=np.int64)
+    self.values = np.empty((2 * capacity + 1,), dtype=np.float64)
+    self.head, self.tail = 0, 0
+
+  def _compact(self, ) -> None:
+    """Moves the queue to the front of the buffers."""
+    count = self.tail - self.head
+    self.indices[:count] = self.indices[self.head:self.tail]
+    self.values[:count] = self.values[self.head:self.tail]
+    self.head, self.tail = 0, count
+
+  def push(self, start: int, values: np.ndarray) -> None:
+    """Pushes a block of samples. Queued samples not less than the
+    minimum of the block are dropped, and of the block only those less
+    than every later sample in the block are queued."""
+    values = values * self.sign
+    suffix = np.minimum.accumulate(values[::-1])[::-1]
+    isKept = np.empty(values.shape, dtype=bool)
+    isKept[-1] = True
+    np.less(values[:-1], suffix[1:], out=isKept[:-1])
+    kept = np.flatnonzero(isKept)
+    queued = self.values[self.head:self.tail]
+    self.tail = self.head + int(np.searchsorted(queued, suffix[0], 'left'))
+    if self.tail + kept.shape[0] > self.values.shape[0]:
+      self._compact()
+    stop = self.tail + kept.shape[0]
+    self.indices[self.tail:stop] = kept + start
+    self.values[self.tail:stop] = values[kept]
+    self.tail = stop
+
+  def pushOne(self, index: int, value: float) -> None:
+    """Pushes a single sample."""
+    value = value * self.sign
+    head, tail, values = self.head, self.tail, self.values
+    while tail > head and values[tail - 1] >= value:
+      tail -= 1
+    if tail == values.shape[0]:
+      self.tail = tail
+      self._compact()
+      tail = self.tail
+    self.indices[tail] = index
+    values[tail] = value
+    self.tail = tail + 1
+
+  def evict(self, oldest: int) -> None:
+    """Drops the samples with an absolute index before 'oldest'."""
+    if self.head < self.tail and self.indices[self.head] < oldest:
+      queued = self.indices[self.head:self.tail]
+      self.head += int(np.searchsorted(queued, oldest, 'left'))
+
+  def front(self, ) -> float:
+    """Returns the extreme value of the window or NaN if empty."""
+    if self.head < self.tail:
+      return float(self.values[self.head] * self.sign)
+    return float('nan')
+
+
+class RunningStats:
+  """RunningStats maintains the count, sum, sum of squares, minimum and
+  maximum of the samples held by a DataRoll. Appended samples are added
+  and evicted samples are subtracted, so every update costs time
+  proportional to the number of samples appended and reading a
+  statistic costs constant time. The minimum and the maximum are kept
+  in monotonic queues of absolute indices, from which evicted samples
+  are dropped at the front.
+
+  As repeated subtraction accumulates rounding error, the sums are
+  recomputed exactly from the held samples each time a full array
+  length has been evicted, which keeps the amortized cost constant."""
+
+  __capacity__ = None
+  __count__ = None
+  __sum__ = None
+  __square_sum__ = None
+  __removed__ = None
+  __min_queue__ = None
+  __max_queue__ = None
+
+  def __init__(self, capacity: int) -> None:
+    if not isinstance(capacity, int):
+      e = typeMsg('capacity', capacity, int)
+      raise TypeError(e)
+    self.__capacity__ = capacity
+    self.__count__ = 0
+    self.__sum__ = 0.0
+    self.__square_sum__ = 0.0
+    self.__removed__ = 0
+    self.__min_queue__ = _MonotonicQueue(capacity, 1.0)
+    self.__max_queue__ = _MonotonicQueue(capacity, -1.0)
+
+  def add(self, start: int, values: np.ndarray, oldest: int) -> None:
+    """Adds a block of samples whose first sample has the absolute index
+    'start', after which 'oldest' is the index of the oldest sample
+    held."""
+    if not values.shape[0]:
+      return
+    self.__count__ += values.shape[0]
+    self.__sum__ += float(np.sum(values))
+    self.__square_sum__ += float(np.dot(values, values))
+    self.__min_queue__.push(start, values)
+    self.__max_queue__.push(start, values)
+    self.__min_queue__.evict(oldest)
+    self.__max_queue__.evict(oldest)
+
+  def addOne(self, index: int, value: float, oldest: int) -> None:
+    """Adds a single sample."""
+    self.__count__ += 1
+    self.__sum__ += value
+    self.__square_sum__ += value * value
+    self.__min_queue__.pushOne(index, value)
+    self.__max_queue__.pushOne(index, value)
+    self.__min_queue__.evict(oldest)
+    self.__max_queue__.evict(oldest)
+
+  def remove(self, values: np.ndarray) -> None:
+    """Subtracts samples about to be evicted from the sums."""
+    if not values.shape[0]:
+      return
+    self.__count__ -= values.shape[0]
+    self.__sum__ -= float(np.sum(values))
+    self.__square_sum__ -= float(np.dot(values, values))
+    self.__removed__ += values.shape[0]
+
+  def removeOne(self, value: float) -> None:
+    """Subtracts a single sample about to be evicted from the sums."""
+    self.__count__ -= 1
+    self.__sum__ -= value
+    self.__square_sum__ -= value * value
+    self.__removed__ += 1
+
+  def isStale(self, ) -> bool:
+    """Returns True once a full array length has been evicted since the
+    sums were last recomputed."""
+    return True if self.__removed__ >= self.__capacity__ else False
+
+  def refresh(self, head: np.ndarray, tail: np.ndarray) -> None:
+    """Recomputes the sums exactly from the two segments of held
+    values."""
+    self.__count__ = head.shape[0] + tail.shape[0]
+    self.__sum__ = float(np.sum(head) + np.sum(tail))
+    self.__square_sum__ = float(np.dot(head, head) + np.dot(tail, tail))
+    self.__removed__ = 0
+
+  @property
+  def count(self, ) -> int:
+    """Returns the number of samples held."""
+    return self.__count__
+
+  @property
+  def minimum(self, ) -> float:
+    """Returns the least value held or NaN if empty."""
+    return self.__min_queue__.front()
+
+  @property
+  def maximum(self, ) -> float:
+    """Returns the greatest value held or NaN if empty."""
+    return self.__max_queue__.front()
+
+  @property
+  def mean(self, ) -> float:
+    """Returns the mean of the values held or NaN if empty."""
+    if self.__count__:
+      return self.__sum__ / self.__count__
+    return float('nan')
+
+  @property
+  def variance(self, ) -> float:
+    """Returns the population variance of the values held or NaN if
+    empty."""
+    if not self.__count__:
+      return float('nan')
+    mean = self.__sum__ / self.__count__
+    return max(self.__square_sum__ / self.__count__ - mean * mean, 0.0)
+
+  @property
+  def std(self, ) -> float:
+    """Returns the population standard deviation of the values held."""
+    return self.variance ** 0.5
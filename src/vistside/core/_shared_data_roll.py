@@ -0,0 +1,329 @@
+"""SharedDataRoll places the ring buffer of a DataRoll in shared memory,
+allowing a producer process to write blocks that are read by the GUI
+process without pickling or copying."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+import os
+import sys
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+import numpy as np
+from vistutils.text import monoSpace
+from vistutils.waitaminute import typeMsg
+
+from vistside.core import DataRoll, MonotonicField, RunningStats
+
+
+class SharedDataRoll(DataRoll):
+  """SharedDataRoll places the ring buffer of a DataRoll in shared memory.
+  The block begins with a header holding a sequence counter, the write
+  index, the fill count, the length, the total count and the epoch of
+  the writing process, followed by the time column and the value
+  column.
+
+  Timestamps are relative to the epoch of the process that writes them.
+  The writer records its epoch in the header with its first write, so a
+  producer that attaches to a block created elsewhere is accounted for.
+  Since the underlying clock is shared by every process, adding
+  'epochOffset' converts them to the epoch of the reading process.
+
+  The sequence counter of the DataRoll lives in the header, so the
+  reader process uses the same 'readBegin', 'readValid' and 'snapshot'
+  protocol as a consumer thread would.
+
+  Running statistics kept by one process would miss the writes of
+  another, so 'enableStats' is not available. The 'minimum', 'maximum',
+  'mean' and 'variance' are instead computed from a snapshot of the
+  values held.
+
+  Callbacks registered in one process are not notified by writes from
+  another process. Readers should instead poll 'sequence', for example
+  on the paint timer. Only a single writer is supported.
+
+  A process attaching to the block registers it with its resource
+  tracker, as SharedMemory does by default. Processes started by
+  multiprocessing share the tracker of their parent, so this leaves the
+  registration of the creator in place. An unrelated process should
+  instead attach with 'track=False', as its own tracker would otherwise
+  unlink the block when the process exits."""
+
+  __shared_memory__ = None
+  __header__ = None
+  __owns_memory__ = None
+  __epoch_stamped__ = None
+  __closed__ = None
+  __stats_buffers__ = None
+  __stats_sequence__ = None
+  __held_stats__ = None
+
+  __header_length__ = 6
+  __created_names__ = set()
+
+  def __init__(self, *args, **kwargs) -> None:
+    """Creates a new shared block if given an integer length, or attaches
+    to an existing block if given its name. When attaching, the keyword
+    'track' sets whether the block is registered with the resource
+    tracker of this process."""
+    self.__callback_functions__ = []
+    self.__flush_pending__ = False
+    self.__epoch_stamped__ = False
+    self.__closed__ = False
+    length, name = None, None
+    for arg in args:
+      if isinstance(arg, int) and length is None:
+        length = arg
+      if isinstance(arg, str) and name is None:
+        name = arg
+    length = kwargs.get('length', length)
+    name = kwargs.get('name', name)
+    if name is None:
+      if length is None:
+        length = self.arrayLength
+      if not isinstance(length, int):
+        e = typeMsg('length', length, int)
+        raise TypeError(e)
+      self._createMemory(length)
+    elif isinstance(name, str):
+      track = kwargs.get('track', True)
+      if not isinstance(track, bool):
+        e = typeMsg('track', track, bool)
+        raise TypeError(e)
+      self._attachMemory(name, track)
+    else:
+      e = typeMsg('name', name, str)
+      raise TypeError(e)
+
+  def _getColumnTypes(self, ) -> tuple[np.dtype, np.dtype]:
+    """Returns the dtypes of the time and value columns as declared by the
+    fields on the class."""
+    cls = type(self)
+    return cls.timeArray.__array_dtype__, cls.valueArray.__array_dtype__
+
+  def _getSize(self, length: int) -> int:
+    """Returns the size in bytes of a block holding the given length."""
+    timeType, valueType = self._getColumnTypes()
+    headerSize = self.__header_length__ * np.dtype(np.int64).itemsize
+    return headerSize + length * (timeType.itemsize + valueType.itemsize)
+
+  def _mapMemory(self, length: int) -> None:
+    """Places the header and the columns on the shared buffer."""
+    timeType, valueType = self._getColumnTypes()
+    buffer = self.__shared_memory__.buf
+    self.__header__ = np.ndarray((self.__header_length__,),
+                                 dtype=np.int64,
+                                 buffer=buffer)
+    offset = self.__header__.nbytes
+    self._timeArray = np.ndarray((length,),
+                                 dtype=timeType,
+                                 buffer=buffer,
+                                 offset=offset)
+    offset += self._timeArray.nbytes
+    self._valueArray = np.ndarray((length,),
+                                  dtype=valueType,
+                                  buffer=buffer,
+                                  offset=offset)
+
+  def _createMemory(self, length: int) -> None:
+    """Creates and initializes a new shared block."""
+    if length < 1:
+      e = """The length of a SharedDataRoll must be positive, but received:
+      '%d'!"""
+      raise ValueError(monoSpace(e % length))
+    self.__shared_memory__ = SharedMemory(create=True,
+                                          size=self._getSize(length))
+    self.__owns_memory__ = True
+    self.__created_names__.add(self.__shared_memory__.name)
+    self._mapMemory(length)
+    self.__header__[:] = 0
+    self.__header__[3] = length
+    self.__header__[5] = MonotonicField.epoch()
+
+  def _attachMemory(self, name: str, track: bool = True) -> None:
+    """Attaches to an existing shared block. Unless 'track' is True, the
+    block is not tracked by this process, leaving its lifetime to the
+    creator alone. A block created by this process keeps the registration
+    of its creator regardless."""
+    isOwn = name.lstrip('/') in self.__created_names__
+    if sys.version_info >= (3, 13):
+      self.__shared_memory__ = SharedMemory(name=name, track=track or isOwn)
+    else:
+      self.__shared_memory__ = SharedMemory(name=name)
+      if os.name == 'posix' and not (track or isOwn):
+        resource_tracker.unregister(self.__shared_memory__._name,
+                                    'shared_memory')
+    self.__owns_memory__ = False
+    header = np.ndarray((self.__header_length__,),
+                        dtype=np.int64,
+                        buffer=self.__shared_memory__.buf)
+    length = int(header[3])
+    del header
+    self._mapMemory(length)
+
+  def _getHeader(self, ) -> np.ndarray:
+    """Returns the header, raising a RuntimeError once this handle is
+    closed. Every read and write goes through the header, so a closed
+    roll fails instead of falling back to memory of its own."""
+    if self.__closed__:
+      e = """The SharedDataRoll has been closed!"""
+      raise RuntimeError(e)
+    return self.__header__
+
+  def _getZeroIndex(self, ) -> int:
+    """Getter-function for the write index."""
+    return int(self._getHeader()[1])
+
+  def _setZeroIndex(self, value: int) -> None:
+    """Setter-function for the write index."""
+    self._getHeader()[1] = value
+
+  def _getFillCount(self, ) -> int:
+    """Getter-function for the fill count."""
+    return int(self._getHeader()[2])
+
+  def _setFillCount(self, value: int) -> None:
+    """Setter-function for the fill count."""
+    self._getHeader()[2] = value
+
+  def _getTotalCount(self, ) -> int:
+    """Getter-function for the total count."""
+    return int(self._getHeader()[4])
+
+  def _setTotalCount(self, value: int) -> None:
+    """Setter-function for the total count."""
+    self._getHeader()[4] = value
+
+  def _getSequence(self, ) -> int:
+    """Getter-function for the sequence counter."""
+    return int(self._getHeader()[0])
+
+  def _setSequence(self, value: int) -> None:
+    """Setter-function for the sequence counter."""
+    self._getHeader()[0] = value
+
+  __zero_index__ = property(_getZeroIndex, _setZeroIndex)
+  __fill_count__ = property(_getFillCount, _setFillCount)
+  __total_count__ = property(_getTotalCount, _setTotalCount)
+  __sequence__ = property(_getSequence, _setSequence)
+
+  def _stampEpoch(self, ) -> None:
+    """Records the epoch of this process in the header, unless already
+    done by an earlier write from this handle."""
+    if not self.__epoch_stamped__:
+      self._getHeader()[5] = MonotonicField.epoch()
+      self.__epoch_stamped__ = True
+
+  def append(self, value: float = None) -> None:
+    """Records the epoch of the writer before appending the value."""
+    self._stampEpoch()
+    DataRoll.append(self, value)
+
+  def _writeRing(self, times: np.ndarray, values: np.ndarray) -> None:
+    """Records the epoch of the writer before writing the block."""
+    self._stampEpoch()
+    DataRoll._writeRing(self, times, values)
+
+  @property
+  def epoch(self, ) -> int:
+    """Returns the epoch of the process that last began writing to the
+    block, or of the creator if nothing has been written yet."""
+    return int(self._getHeader()[5])
+
+  @property
+  def epochOffset(self, ) -> int:
+    """Returns the nanoseconds to add to the timestamps in the block to
+    express them relative to the epoch of this process."""
+    return self.epoch - MonotonicField.epoch()
+
+  def enableStats(self, ) -> RunningStats:
+    """Running statistics kept by this process would not see the writes
+    of other processes. The statistic properties instead compute their
+    values from a snapshot."""
+    e = """Running statistics are not available on a SharedDataRoll!"""
+    raise TypeError(e)
+
+  def _heldStats(self, ) -> tuple[float, float, float, float]:
+    """Returns the minimum, maximum, mean and variance of the values held,
+    computed from a single snapshot and reused until the sequence counter
+    changes. If the writer keeps the snapshot from succeeding, the values
+    are read without the check, in which case they may mix samples of
+    consecutive writes."""
+    sequence = self.__sequence__
+    if self.__stats_sequence__ == sequence:
+      return self.__held_stats__
+    if self.__stats_buffers__ is None:
+      self.__stats_buffers__ = (np.empty_like(self.timeArray),
+                                np.empty_like(self.valueArray))
+    try:
+      values = self.snapshot(*self.__stats_buffers__)[1]
+    except RuntimeError:
+      values = self.readValues(self.__stats_buffers__[1])
+    if values.shape[0]:
+      self.__held_stats__ = (float(np.min(values)),
+                             float(np.max(values)),
+                             float(np.mean(values)),
+                             float(np.var(values)))
+    else:
+      self.__held_stats__ = (float('nan'),) * 4
+    self.__stats_sequence__ = sequence
+    return self.__held_stats__
+
+  @property
+  def minimum(self, ) -> float:
+    """Returns the least value held or NaN if empty."""
+    return self._heldStats()[0]
+
+  @property
+  def maximum(self, ) -> float:
+    """Returns the greatest value held or NaN if empty."""
+    return self._heldStats()[1]
+
+  @property
+  def mean(self, ) -> float:
+    """Returns the mean of the values held or NaN if empty."""
+    return self._heldStats()[2]
+
+  @property
+  def variance(self, ) -> float:
+    """Returns the population variance of the values held or NaN if
+    empty."""
+    return self._heldStats()[3]
+
+  @property
+  def name(self, ) -> str:
+    """Returns the name other processes use to attach to the block."""
+    return self.__shared_memory__.name
+
+  def close(self, ) -> None:
+    """Releases the views and closes this handle on the block. The block
+    itself remains available to other processes until unlinked. Reading
+    or appending afterwards raises a RuntimeError."""
+    if self.__closed__:
+      return
+    self.__closed__ = True
+    self.__header__ = None
+    self._timeArray = None
+    self._valueArray = None
+    self.__shared_memory__.close()
+
+  def unlink(self, ) -> None:
+    """Requests the block be destroyed once every handle is closed. Only
+    the process that created the block should call this."""
+    if not self.__owns_memory__:
+      e = """Only the process that created the block may unlink it!"""
+      raise PermissionError(e)
+    self.__shared_memory__.unlink()
+    self.__created_names__.discard(self.__shared_memory__.name)
+
+  @classmethod
+  def getDefault(cls, *args, **kwargs) -> SharedDataRoll:
+    """Returns the default value for the field."""
+    return cls(*[arg for arg in args if isinstance(arg, (int, str))],
+               **kwargs)
+
+  def apply(self, value: Any) -> SharedDataRoll:
+    """The length of a shared block is fixed once created."""
+    return self
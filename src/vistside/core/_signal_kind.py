@@ -0,0 +1,17 @@
+"""SignalKind specifies the signal produced by a SignalSource"""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+from enum import Enum
+
+
+class SignalKind(Enum):
+  """Specifies the signal produced by a SignalSource. WHITE has a flat
+  spectrum. PINK falls by 3 dB per octave and BROWN by 6 dB per octave.
+  SWEEP is a sine whose frequency rises linearly and then restarts."""
+
+  WHITE = 0
+  PINK = 1
+  BROWN = 2
+  SWEEP = 3
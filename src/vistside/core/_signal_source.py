@@ -0,0 +1,201 @@
+"""SignalSource produces an endless stream of fixed size chunks of noise
+or sine sweeps for load testing."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+import time
+from typing import Any
+
+import numpy as np
+from vistutils.text import monoSpace
+from vistutils.waitaminute import typeMsg
+
+from vistside.core import SignalKind, MonotonicField, DataRoll
+
+
+class SignalSource:
+  """SignalSource produces an endless stream of fixed size chunks of
+  noise or sine sweeps. It is an iterator, and each call to 'next'
+  returns the following chunk. The state carried between chunks is a
+  handful of numbers, so memory use does not grow with the number of
+  chunks produced, and the signal continues across chunk boundaries
+  exactly as if it had been produced in one piece.
+
+  Pink noise uses the Voss-McCartney algorithm, vectorised over each
+  chunk: row r is redrawn at every sample whose index has r trailing
+  zero bits. Each row draws from its own generator, spawned from the
+  seeded one, so the draws do not depend on the chunk length. Brown
+  noise is white noise passed through a leaky integrator, so it does not
+  drift without bound during long runs. The sweep keeps a phase
+  accumulator, so its phase is continuous, also when the frequency
+  restarts."""
+
+  __signal_kind__ = None
+  __chunk_length__ = None
+  __sample_rate__ = None
+  __amplitude__ = None
+  __random_generator__ = None
+  __sample_index__ = None
+  __pink_rows__ = None
+  __row_generators__ = None
+  __brown_state__ = None
+  __brown_leak__ = None
+  __sweep_range__ = None
+  __sweep_duration__ = None
+  __phase__ = None
+  __running__ = None
+
+  __pink_row_count__ = 16
+
+  def __init__(self,
+               kind: SignalKind = None,
+               chunkLength: int = None,
+               sampleRate: float = None,
+               **kwargs) -> None:
+    """The keyword arguments 'amplitude' and 'seed' apply to every kind.
+    'leak' sets the leak of the brown noise integrator, while 'f0', 'f1'
+    and 'sweepDuration' set the start and end frequencies in Hz and the
+    duration in seconds of each sweep."""
+    kind = SignalKind.WHITE if kind is None else kind
+    if not isinstance(kind, SignalKind):
+      e = typeMsg('kind', kind, SignalKind)
+      raise TypeError(e)
+    chunkLength = 1024 if chunkLength is None else chunkLength
+    if not isinstance(chunkLength, int):
+      e = typeMsg('chunkLength', chunkLength, int)
+      raise TypeError(e)
+    sampleRate = 1000.0 if sampleRate is None else float(sampleRate)
+    if chunkLength < 1 or sampleRate <= 0:
+      e = """Expected a positive chunk length and sample rate, but
+      received: '%s' and '%s'!"""
+      raise ValueError(monoSpace(e % (chunkLength, sampleRate)))
+    self.__signal_kind__ = kind
+    self.__chunk_length__ = chunkLength
+    self.__sample_rate__ = sampleRate
+    self.__amplitude__ = float(kwargs.get('amplitude', 1.0))
+    self.__random_generator__ = np.random.default_rng(kwargs.get('seed'))
+    self.__sample_index__ = 0
+    self.__pink_rows__ = self.__random_generator__.standard_normal(
+      self.__pink_row_count__)
+    self.__row_generators__ = self.__random_generator__.spawn(
+      self.__pink_row_count__)
+    self.__brown_state__ = 0.0
+    self.__brown_leak__ = float(kwargs.get('leak', 0.999))
+    f0 = float(kwargs.get('f0', 1.0))
+    f1 = float(kwargs.get('f1', sampleRate / 4))
+    self.__sweep_range__ = (f0, f1)
+    self.__sweep_duration__ = float(kwargs.get('sweepDuration', 10.0))
+    self.__phase__ = 0.0
+    self.__running__ = False
+
+  @property
+  def sampleRate(self, ) -> float:
+    """Returns the number of samples per second."""
+    return self.__sample_rate__
+
+  def sampleCount(self, ) -> int:
+    """Returns the number of samples produced so far."""
+    return self.__sample_index__
+
+  def __iter__(self, ) -> SignalSource:
+    return self
+
+  def __next__(self, ) -> np.ndarray:
+    """Returns the next chunk."""
+    n = self.__chunk_length__
+    if self.__signal_kind__ is SignalKind.WHITE:
+      chunk = self.__random_generator__.standard_normal(n)
+    elif self.__signal_kind__ is SignalKind.PINK:
+      chunk = self._pinkChunk(n)
+    elif self.__signal_kind__ is SignalKind.BROWN:
+      chunk = self._brownChunk(n)
+    else:
+      chunk = self._sweepChunk(n)
+    self.__sample_index__ += n
+    return chunk * self.__amplitude__
+
+  def _pinkChunk(self, n: int) -> np.ndarray:
+    """Returns a chunk of pink noise."""
+    rng, rows = self.__random_generator__, self.__pink_rows__
+    rowGenerators = self.__row_generators__
+    index = np.arange(self.__sample_index__, self.__sample_index__ + n)
+    index[index == 0] = 1 << rows.shape[0]
+    lowBit = index & -index
+    row = np.log2(lowBit).astype(np.int64)
+    out = rng.standard_normal(n)
+    for r in range(rows.shape[0]):
+      isDrawn = row == r
+      fresh = rowGenerators[r].standard_normal(isDrawn.sum())
+      draws = np.concatenate(([rows[r]], fresh))
+      out += draws[np.cumsum(isDrawn)]
+      rows[r] = draws[-1]
+    return out / np.sqrt(rows.shape[0] + 1)
+
+  def _brownChunk(self, n: int) -> np.ndarray:
+    """Returns a chunk of brown noise. The leaky integration is evaluated
+    in closed form over blocks short enough that the powers of the leak
+    do not underflow."""
+    leak = self.__brown_leak__
+    white = self.__random_generator__.standard_normal(n)
+    block = n
+    if leak < 1:
+      white *= np.sqrt(1 - leak * leak)
+      block = max(int(600 / -np.log(leak)), 1)
+    out = np.empty((n,))
+    for start in range(0, n, block):
+      w = white[start:start + block]
+      powers = leak ** np.arange(1, w.shape[0] + 1)
+      y = powers * (self.__brown_state__ + np.cumsum(w / powers))
+      out[start:start + block] = y
+      self.__brown_state__ = y[-1]
+    return out
+
+  def _sweepChunk(self, n: int) -> np.ndarray:
+    """Returns a chunk of the sine sweep."""
+    (f0, f1), fs = self.__sweep_range__, self.__sample_rate__
+    period = max(int(self.__sweep_duration__ * fs), 1)
+    index = np.arange(self.__sample_index__, self.__sample_index__ + n)
+    frequency = f0 + (f1 - f0) * ((index % period) / period)
+    phase = self.__phase__ + np.cumsum(frequency * (2 * np.pi / fs))
+    self.__phase__ = float(phase[-1] % (2 * np.pi))
+    return np.sin(phase)
+
+  def stop(self, ) -> None:
+    """Makes a running 'feed' return after the current chunk. This may be
+    called from another thread."""
+    self.__running__ = False
+
+  def feed(self,
+           dataRoll: DataRoll,
+           chunkCount: int = None,
+           speed: Any = 1.0) -> int:
+    """Appends chunks to the data roll until 'chunkCount' chunks have
+    been appended or 'stop' is called, and returns the number of samples
+    appended. Each chunk is appended in one call to 'appendMany' with
+    timestamps following the sample clock from the moment 'feed' starts.
+    With a 'speed' of 1.0 the chunks are paced to real time, larger
+    values run faster than real time, and None runs as fast as
+    possible. The call blocks, so it is meant to run on a worker
+    thread."""
+    if not isinstance(dataRoll, DataRoll):
+      e = typeMsg('dataRoll', dataRoll, DataRoll)
+      raise TypeError(e)
+    n, fs = self.__chunk_length__, self.__sample_rate__
+    startTime, startIndex = MonotonicField.now(), self.__sample_index__
+    offsets = np.arange(n) * (1e9 / fs)
+    self.__running__ = True
+    count = 0
+    while self.__running__ and (chunkCount is None or count < chunkCount):
+      first = self.__sample_index__ - startIndex
+      chunk = next(self)
+      times = startTime + (first * (1e9 / fs) + offsets).astype(np.int64)
+      if speed is not None:
+        due = startTime + (first + n) * 1e9 / (fs * speed)
+        delay = (due - MonotonicField.now()) * 1e-9
+        if delay > 0:
+          time.sleep(delay)
+      dataRoll.appendMany(chunk, times)
+      count += 1
+    self.__running__ = False
+    return count * n
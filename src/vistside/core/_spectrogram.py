@@ -0,0 +1,159 @@
+"""Spectrogram computes a short time Fourier transform of the values
+appended to a DataRoll as they arrive."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from vistutils.text import monoSpace
+from vistutils.waitaminute import typeMsg
+
+from vistside.core import DataRoll
+
+
+class Spectrogram:
+  """Spectrogram computes a short time Fourier transform of the values
+  appended to a DataRoll as they arrive. It subscribes to the roll and,
+  on each notification, cuts every complete frame of 'frameLength'
+  samples starting 'hopLength' samples apart, applies a Hann window and
+  transforms all the new frames in a single call to 'np.fft.rfft'. The
+  magnitudes are kept in a ring of 'frameCount' spectra, together with
+  the timestamp of the centre of each frame.
+
+  Frames are only cut from samples still held by the roll, so the roll
+  should be at least as long as the frames plus the samples appended
+  between notifications. If samples are lost, the frames resume at the
+  oldest sample held. The roll must have a single channel."""
+
+  __data_roll__ = None
+  __frame_length__ = None
+  __hop_length__ = None
+  __window__ = None
+  __spectra__ = None
+  __frame_times__ = None
+  __zero_index__ = None
+  __fill_count__ = None
+  __next_start__ = None
+  __sample_buffer__ = None
+  __time_buffer__ = None
+
+  def __init__(self,
+               dataRoll: DataRoll,
+               frameLength: int = None,
+               hopLength: int = None,
+               frameCount: int = None) -> None:
+    if not isinstance(dataRoll, DataRoll):
+      e = typeMsg('dataRoll', dataRoll, DataRoll)
+      raise TypeError(e)
+    frameLength = 256 if frameLength is None else frameLength
+    hopLength = frameLength // 2 if hopLength is None else hopLength
+    frameCount = 128 if frameCount is None else frameCount
+    for (name, val) in zip(['frameLength', 'hopLength', 'frameCount'],
+                           [frameLength, hopLength, frameCount]):
+      if not isinstance(val, int):
+        e = typeMsg(name, val, int)
+        raise TypeError(e)
+      if val < 1:
+        e = """Expected '%s' to be positive, but received: '%d'!"""
+        raise ValueError(monoSpace(e % (name, val)))
+    if frameLength > len(dataRoll):
+      e = """The frame length %d exceeds the length %d of the data roll!"""
+      raise ValueError(monoSpace(e % (frameLength, len(dataRoll))))
+    self.__data_roll__ = dataRoll
+    self.__frame_length__ = frameLength
+    self.__hop_length__ = hopLength
+    self.__window__ = np.hanning(frameLength)
+    bins = frameLength // 2 + 1
+    self.__spectra__ = np.zeros((frameCount, bins), dtype=np.float64)
+    self.__frame_times__ = np.zeros((frameCount,), dtype=np.int64)
+    self.__zero_index__ = 0
+    self.__fill_count__ = 0
+    self.__next_start__ = dataRoll.totalCount() - dataRoll.count()
+    self.update(self.__next_start__, dataRoll.totalCount())
+    dataRoll.appendCallback(self.update)
+
+  def __len__(self, ) -> int:
+    """Returns the number of spectra the ring can hold."""
+    return self.__spectra__.shape[0]
+
+  def count(self, ) -> int:
+    """Returns the number of spectra currently held."""
+    return self.__fill_count__
+
+  def _getBuffers(self, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Returns buffers for at least 'n' samples, growing them if
+    needed."""
+    if self.__sample_buffer__ is None or self.__sample_buffer__.shape[0] < n:
+      self.__sample_buffer__ = np.empty((n,), dtype=np.float64)
+      self.__time_buffer__ = np.empty((n,), dtype=np.int64)
+    return self.__sample_buffer__, self.__time_buffer__
+
+  def update(self, start: int, stop: int) -> None:
+    """Transforms every complete frame available up to the absolute index
+    'stop'. This is the callback registered on the data roll."""
+    roll, hop = self.__data_roll__, self.__hop_length__
+    frameLength = self.__frame_length__
+    oldest = roll.totalCount() - roll.count()
+    if self.__next_start__ < oldest:
+      lost = oldest - self.__next_start__
+      self.__next_start__ += -(-lost // hop) * hop
+    available = stop - frameLength - self.__next_start__
+    if available < 0:
+      return
+    frames = available // hop + 1
+    if frames > len(self):
+      self.__next_start__ += (frames - len(self)) * hop
+      frames = len(self)
+    first = self.__next_start__
+    last = first + (frames - 1) * hop + frameLength
+    samples, times = self._getBuffers(last - first)
+    samples = roll._readInto(*roll.valueSegments(first, last), samples)
+    times = roll._readInto(*roll.timeSegments(first, last), times)
+    windows = sliding_window_view(samples, frameLength)[::hop]
+    spectra = np.abs(np.fft.rfft(windows * self.__window__, axis=1))
+    centres = times[frameLength // 2::hop][:frames]
+    self._writeRing(centres, spectra)
+    self.__next_start__ = first + frames * hop
+
+  def _writeRing(self, times: np.ndarray, spectra: np.ndarray) -> None:
+    """Writes the spectra with at most two slice assignments."""
+    n, k, start = len(self), spectra.shape[0], self.__zero_index__
+    head = min(k, n - start)
+    self.__spectra__[start:start + head] = spectra[:head]
+    self.__frame_times__[start:start + head] = times[:head]
+    if head < k:
+      self.__spectra__[:k - head] = spectra[head:]
+      self.__frame_times__[:k - head] = times[head:]
+    self.__zero_index__ = (start + k) % n
+    self.__fill_count__ = min(self.__fill_count__ + k, n)
+
+  def _read(self, array: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """Returns the held part of the given ring in chronological order."""
+    n, fill, zero = len(self), self.__fill_count__, self.__zero_index__
+    if fill < n:
+      head, tail = array[:fill], array[:0]
+    else:
+      head, tail = array[zero:], array[:zero]
+    return DataRoll._readInto(head, tail, out)
+
+  def readSpectra(self, out: np.ndarray = None) -> np.ndarray:
+    """Returns the held magnitude spectra in chronological order as an
+    array of shape (count, frameLength // 2 + 1)."""
+    return self._read(self.__spectra__, out)
+
+  def readTimes(self, out: np.ndarray = None) -> np.ndarray:
+    """Returns the timestamps of the centres of the held frames."""
+    return self._read(self.__frame_times__, out)
+
+  def frequencies(self, sampleRate: float = None) -> np.ndarray:
+    """Returns the frequency of each bin. If the sample rate is not given,
+    it is estimated from the timestamps of the held frames."""
+    if sampleRate is None:
+      times = self.readTimes()
+      if times.shape[0] < 2 or times[-1] <= times[0]:
+        sampleRate = 1.0
+      else:
+        seconds = DataRoll.toSeconds(times[-1] - times[0])
+        sampleRate = (times.shape[0] - 1) * self.__hop_length__ / seconds
+    return np.fft.rfftfreq(self.__frame_length__, 1.0 / sampleRate)
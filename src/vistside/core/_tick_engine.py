@@ -0,0 +1,127 @@
+"""TickEngine places axis ticks at nice numbers and keeps the axis range
+and tick spacing stable while the data fluctuates."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+from math import floor, ceil, log10
+from typing import Any
+
+import numpy as np
+from vistutils.waitaminute import typeMsg
+
+
+class TickEngine:
+  """TickEngine places axis ticks at nice numbers, that is 1, 2 or 5
+  times a power of ten, choosing the step in one vectorised operation
+  over the candidates. Both the step and the axis range are kept with
+  hysteresis: the step is kept while it gives between half and twice
+  the requested number of ticks, and 'autoRange' keeps the range while
+  the data fits inside it and fills at least 'shrinkFraction' of it.
+  Small fluctuations of the data therefore leave the ticks and their
+  labels unchanged, so layouts and caches keyed on them stay valid."""
+
+  __count__ = None
+  __margin__ = None
+  __shrink_fraction__ = None
+  __step__ = None
+  __range__ = None
+
+  __mantissas__ = np.array([1.0, 2.0, 5.0, 10.0])
+
+  def __init__(self,
+               count: int = None,
+               margin: float = None,
+               shrinkFraction: float = None) -> None:
+    """'count' sets the number of ticks aimed for. 'autoRange' pads the
+    data by 'margin' times its span on each side before rounding the
+    range outwards to multiples of a nice step of about half the tick
+    spacing. The data fills at least 40 percent of a new range, so a
+    'shrinkFraction' above that makes the range alternate."""
+    count = 5 if count is None else count
+    if not isinstance(count, int):
+      e = typeMsg('count', count, int)
+      raise TypeError(e)
+    self.__count__ = max(count, 1)
+    self.__margin__ = 0.05 if margin is None else float(margin)
+    shrink = 0.25 if shrinkFraction is None else shrinkFraction
+    self.__shrink_fraction__ = float(shrink)
+
+  @classmethod
+  def niceStep(cls, span: Any, count: Any) -> Any:
+    """Returns the smallest nice step giving at most 'count' intervals
+    over 'span'. Both may be arrays, in which case a step is returned
+    for each pair."""
+    raw = np.asarray(span, dtype=np.float64) / np.asarray(count)
+    raw = np.where(raw > 0, raw, 1.0)
+    magnitude = 10.0 ** np.floor(np.log10(raw))
+    candidates = magnitude[..., None] * cls.__mantissas__
+    index = np.argmax(candidates >= raw[..., None] * (1 - 1e-9), axis=-1)
+    step = np.take_along_axis(candidates, index[..., None], -1)[..., 0]
+    return float(step) if step.ndim == 0 else step
+
+  @staticmethod
+  def decimalsFor(step: float) -> int:
+    """Returns the number of decimals needed to label multiples of the
+    step."""
+    return max(0, -floor(log10(step) + 1e-9))
+
+  @property
+  def step(self, ) -> float:
+    """Returns the step of the most recent ticks, or None."""
+    return self.__step__
+
+  @property
+  def decimals(self, ) -> int:
+    """Returns the number of decimals needed to label the most recent
+    ticks."""
+    return 0 if self.__step__ is None else self.decimalsFor(self.__step__)
+
+  def _chooseStep(self, span: float, count: int) -> float:
+    """Returns the current step if it still gives between half and twice
+    the requested number of ticks, and otherwise a new nice step."""
+    step = self.__step__
+    if step is not None and count / 2 <= span / step <= count * 2:
+      return step
+    self.__step__ = self.niceStep(span, count)
+    return self.__step__
+
+  def ticks(self, low: float, high: float, count: int = None) -> np.ndarray:
+    """Returns the multiples of the step from 'low' to 'high'."""
+    count = self.__count__ if count is None else count
+    span = high - low
+    if not (span > 0 and np.isfinite(span)):
+      return np.empty((0,))
+    step = self._chooseStep(span, count)
+    first, last = ceil(low / step - 1e-9), floor(high / step + 1e-9)
+    values = np.arange(first, last + 1) * step
+    return np.round(values, self.decimalsFor(step))
+
+  def autoRange(self, low: float, high: float) -> tuple[float, float]:
+    """Returns an axis range containing 'low' and 'high'. The previous
+    range is kept while the data fits inside it and fills at least the
+    shrink fraction of it. Otherwise the data is padded by the margin
+    and rounded outwards to whole nice steps of half the tick
+    spacing."""
+    if not (np.isfinite(low) and np.isfinite(high)):
+      return (0.0, 1.0) if self.__range__ is None else self.__range__
+    if self.__range__ is not None:
+      rangeLow, rangeHigh = self.__range__
+      if rangeLow <= low and high <= rangeHigh:
+        if high - low >= self.__shrink_fraction__ * (rangeHigh - rangeLow):
+          return self.__range__
+    span = high - low
+    if span <= 0:
+      span = abs(low) or 1.0
+    pad = span * self.__margin__
+    step = self.niceStep(span + 2 * pad, 2 * self.__count__)
+    rangeLow = floor((low - pad) / step) * step
+    rangeHigh = ceil((high + pad) / step) * step
+    decimals = self.decimalsFor(step)
+    self.__range__ = (round(rangeLow, decimals), round(rangeHigh, decimals))
+    return self.__range__
+
+  def reset(self, ) -> None:
+    """Forgets the kept step and range."""
+    self.__step__ = None
+    self.__range__ = None
@@ -8,4 +8,7 @@ from ._abstract_paint import AbstractPaint
 from ._border_rect import BorderRect
 from ._fill_rect import FillRect
 from ._data_paint import DataPaint
+from ._strip_chart_paint import StripChartPaint
+from ._threaded_data_paint import ThreadedDataPaint
 from ._text_rect import TextRect
+from ._paint_profiler import PaintProfiler
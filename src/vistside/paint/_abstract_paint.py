@@ -8,17 +8,17 @@ from abc import abstractmethod
 from typing import TYPE_CHECKING, Self
 
 from PySide6.QtGui import QPainter, QPaintEvent
-from vistutils.fields import Field
+from vistutils.fields import CoreDescriptor
 
 if TYPE_CHECKING:
-  from ezros.gui.widgets import PaintWidget
+  from PySide6.QtWidgets import QWidget as PaintWidget
 
   PW = PaintWidget
 
 Sig = tuple[type]
 
 
-class AbstractPaint(Field):
+class AbstractPaint(CoreDescriptor):
   """AbstractPaint provides the abstract baseclass for the encapsulated
   painting operations"""
 
@@ -26,6 +26,11 @@ class AbstractPaint(Field):
   def paintOp(self, event: QPaintEvent, painter: QPainter) -> None:
     """Applies the paint operation"""
 
+  def isVolatile(self, ) -> bool:
+    """Returns True if the paint may change between paint events without
+    being invalidated, in which case it is not cached as a layer."""
+    return False
+
   def __set_name__(self, owner: PaintWidget, name: str) -> None:
     owner.appendHookedPaint(self)
 
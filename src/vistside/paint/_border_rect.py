@@ -5,9 +5,8 @@ from __future__ import annotations
 
 from PySide6.QtGui import QPaintEvent, QPainter
 
-from ezros.gui.factories import emptyBrush, parsePen
-from ezros.gui.paint import AbstractPaint
-from ezros.gui.shortnames import Black
+from vistside.core import emptyBrush, parsePen, Black
+from vistside.paint import AbstractPaint
 
 
 # from _dep.morevistutils import Wait
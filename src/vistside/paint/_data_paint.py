@@ -6,21 +6,41 @@ from __future__ import annotations
 from math import ceil, floor
 from typing import Any
 
-from PySide6.QtCore import Qt, QRect, QPoint, QLine
-from PySide6.QtGui import QPainter, QPaintEvent
+import numpy as np
+import shiboken6
+from PySide6.QtCore import Qt, QRect, QPoint, QLine, QMargins, QSize
+from PySide6.QtGui import QPainter, QPaintEvent, QPolygonF, QPixmap, QPen
+from PySide6.QtGui import QBrush, QStaticText, QTransform, QFont
+from vistutils.fields import Wait
 
-from ezros.gui.factories import emptyBrush, parsePen, parseFont, parseBrush
-from ezros.gui.factories import emptyPen
-from ezros.gui.paint import AbstractPaint
-from ezros.gui.shortnames import Silver, Black, RoundCap, SolidLine
-from ezros.gui.shortnames import AliceBlue, SolidFill, OliveDrab
-from ezros.rosutils import Wait, DataEcho
+from vistside.core import emptyBrush, parsePen, parseFont, parseBrush
+from vistside.core import emptyPen, DataRoll, DecimationMode, decimate
+from vistside.core import PlotMode, TickEngine
+from vistside.core import Silver, Black, RoundCap, SolidLine
+from vistside.core import AliceBlue, SolidFill, OliveDrab
+from vistside.paint import AbstractPaint
 
 
 class DataPaint(AbstractPaint):
   """DataPaint paints data points on the widget"""
 
   __fallback_pen__ = None
+  __time_buffer__ = None
+  __value_buffer__ = None
+  __front_index__ = None
+  __front_data__ = None
+  __decimation_mode__ = DecimationMode.MINMAX
+  __plot_mode__ = PlotMode.POINTS
+  __polygon__ = None
+  __background_cache__ = None
+  __background_key__ = None
+  __static_texts__ = None
+  __tick_layouts__ = None
+  __time_ticks__ = None
+  __value_ticks__ = None
+  __frame_range__ = None
+
+  __max_static_texts__ = 512
 
   pointPen = Wait(parsePen, Black, 4, SolidLine, RoundCap)
   majorGridPen = Wait(parsePen, Silver, 1, SolidLine, RoundCap)
@@ -32,11 +52,211 @@ class DataPaint(AbstractPaint):
   tickFillBrush = Wait(parseBrush, OliveDrab, SolidFill)
 
   def __init__(self, *args) -> None:
-    self.dataEcho = DataEcho(128)
+    self.dataRoll = DataRoll.getDefault(128, stats=True)
+    self.__time_ticks__ = TickEngine(8)
+    self.__value_ticks__ = TickEngine(4)
+    for arg in args:
+      if isinstance(arg, DecimationMode):
+        self.__decimation_mode__ = arg
+      if isinstance(arg, PlotMode):
+        self.__plot_mode__ = arg
+
+  def isVolatile(self, ) -> bool:
+    """The data changes between paint events, so DataPaint is painted
+    directly, relying on its own caches of the static parts."""
+    return True
 
   def callback(self, data: Any) -> None:
     """Callback for data update"""
-    self.dataEcho.append(data.data)
+    self.dataRoll.append(data.data)
+
+  def _readData(self, ) -> tuple[np.ndarray, np.ndarray]:
+    """Reads the data in the same way as '_snapshotData', except that if
+    the producer keeps the snapshot from succeeding, the data read by the
+    previous paint is returned again."""
+    try:
+      return self._snapshotData()
+    except RuntimeError:
+      return self.__front_data__
+
+  def _snapshotData(self, ) -> tuple[np.ndarray, np.ndarray]:
+    """Reads a consistent snapshot of the data roll into buffers reused
+    between paints. The timestamps are converted to seconds. The snapshot
+    is read into the back of two pairs of buffers, which become the front
+    once the read succeeds, so a failed read leaves the previous data
+    intact. Raises the RuntimeError of 'snapshot' if the read fails."""
+    n = len(self.dataRoll)
+    if self.__time_buffer__ is None or self.__time_buffer__.shape[1] != n:
+      self.__time_buffer__ = np.empty((2, n), dtype=np.float64)
+      self.__value_buffer__ = np.empty((2, n), dtype=np.float64)
+      self.__front_data__ = (self.__time_buffer__[0, :0],
+                             self.__value_buffer__[0, :0])
+      self.__front_index__ = 0
+    back = 1 - self.__front_index__
+    times, values = self.dataRoll.snapshot(self.__time_buffer__[back],
+                                           self.__value_buffer__[back])
+    times = self.dataRoll.toSeconds(times, times)
+    self.__front_index__ = back
+    self.__front_data__ = (times, values)
+    return times, values
+
+  @staticmethod
+  def _getRange(data: np.ndarray) -> tuple[float, float]:
+    """Returns the range spanned by the data, widened if empty."""
+    if not data.shape[0]:
+      return 0.0, 1.0
+    low, high = float(np.min(data)), float(np.max(data))
+    if high - low > 0:
+      return low, high
+    return low - 0.5, high + 0.5
+
+  def dataRange(self,
+                times: np.ndarray = None,
+                values: np.ndarray = None) -> tuple[float, ...]:
+    """Returns the time and value ranges of the data as (tMin, tMax, vMin,
+    vMax). If not given, the times are taken from the oldest and newest
+    samples of the data roll and the values from its running statistics,
+    so no samples are scanned. The value range is rounded outwards to nice
+    numbers and kept while the data fluctuates inside it, so the value
+    axis does not change on every frame."""
+    return self._rangeWith(self.__value_ticks__, times, values)
+
+  def _rangeWith(self,
+                 valueTicks: TickEngine,
+                 times: np.ndarray = None,
+                 values: np.ndarray = None) -> tuple[float, ...]:
+    """Returns the ranges in the same way as 'dataRange', keeping the
+    value range with the given TickEngine."""
+    if times is None or values is None:
+      head, tail = self.dataRoll.timeSegments()
+      newest = tail if tail.shape[0] else head
+      ends = np.concatenate((head[:1], newest[-1:]))
+      times = self.dataRoll.toSeconds(ends)
+      low, high = self.dataRoll.minimum, self.dataRoll.maximum
+      values = np.array([low, high]) if low == low else times[:0]
+    if times.shape[0]:
+      tMin, tMax = float(times[0]), float(times[-1])
+      if tMax <= tMin:
+        tMin, tMax = tMin - 0.5, tMax + 0.5
+    else:
+      tMin, tMax = 0.0, 1.0
+    return tMin, tMax, *valueTicks.autoRange(*self._getRange(values))
+
+  def _getPolygon(self, n: int) -> tuple[QPolygonF, np.ndarray]:
+    """Returns the polygon reused between paints resized to 'n' points,
+    together with an array of shape (n, 2) sharing its memory. Writing to
+    the array sets the coordinates of the points directly. The array is
+    only valid until the polygon is resized."""
+    if self.__polygon__ is None:
+      self.__polygon__ = QPolygonF()
+    polygon = self.__polygon__
+    polygon.resize(n)
+    if not n:
+      return polygon, np.empty((0, 2))
+    address = shiboken6.getCppPointer(polygon.data())[0]
+    buffer = shiboken6.VoidPtr(address, n * 16, True)
+    return polygon, np.frombuffer(buffer, dtype=np.float64).reshape(n, 2)
+
+  def dataPolygon(self, rect: QRect) -> QPolygonF:
+    """Maps the data to a polygon in the given rectangle according to the
+    plot mode. The data is decimated to the width of the rectangle and
+    then mapped to pixels by one affine transform per axis, written
+    straight into the memory of the polygon. The ranges are taken from
+    the same snapshot and kept for the ticks of the frame."""
+    times, values = self._readData()
+    ranges = self.dataRange(times, values)
+    self.__frame_range__ = ranges
+    if not times.shape[0]:
+      return self._getPolygon(0)[0]
+    times, values = decimate(times, values, rect.width(),
+                             self.__decimation_mode__)
+    return self.mapPolygon(times, values, rect, ranges)
+
+  def mapPolygon(self,
+                 times: np.ndarray,
+                 values: np.ndarray,
+                 rect: QRect,
+                 ranges: tuple[float, ...]) -> QPolygonF:
+    """Maps the times and values to a polygon in the given rectangle,
+    where 'ranges' holds the (tMin, tMax, vMin, vMax) spanned by the
+    rectangle."""
+    n = times.shape[0]
+    if not n:
+      return self._getPolygon(0)[0]
+    tMin, tMax, vMin, vMax = ranges
+    x = times - tMin
+    x *= rect.width() / (tMax - tMin)
+    x += rect.left()
+    y = values - vMin
+    y *= -rect.height() / (vMax - vMin)
+    y += rect.bottom()
+    if self.__plot_mode__ is PlotMode.STEPS:
+      polygon, points = self._getPolygon(2 * n - 1)
+      points[0::2, 0], points[1::2, 0] = x, x[1:]
+      points[0::2, 1], points[1::2, 1] = y, y[:-1]
+    else:
+      polygon, points = self._getPolygon(n)
+      points[:, 0], points[:, 1] = x, y
+    return polygon
+
+  def _staticText(self, label: str, font: QFont) -> QStaticText:
+    """Returns the label laid out in the font, reusing the layout if the
+    same label was drawn before in the same font."""
+    if self.__static_texts__ is None:
+      self.__static_texts__ = {}
+    key = (label, font.key())
+    if key not in self.__static_texts__:
+      if len(self.__static_texts__) >= self.__max_static_texts__:
+        self.__static_texts__.clear()
+      text = QStaticText(label)
+      text.setTextFormat(Qt.TextFormat.PlainText)
+      text.prepare(QTransform(), font)
+      self.__static_texts__[key] = text
+    return self.__static_texts__[key]
+
+  def _tickLayout(self, axis: str, key: tuple, create: callable) -> Any:
+    """Returns the cached layout of the ticks on the given axis, or their
+    labels in the case of the time axis, calling 'create' to lay them out
+    again only if the key has changed."""
+    if self.__tick_layouts__ is None:
+      self.__tick_layouts__ = {}
+    cachedKey, layout = self.__tick_layouts__.get(axis, (None, None))
+    if cachedKey != key:
+      layout = create()
+      self.__tick_layouts__[axis] = (key, layout)
+    return layout
+
+  def frameRange(self, ) -> tuple[float, ...]:
+    """Returns the ranges the data of the current frame was mapped with,
+    or the range of the data if no data has been mapped yet."""
+    if self.__frame_range__ is None:
+      return self.dataRange()
+    return self.__frame_range__
+
+  def horizontalTicks(self,
+                      n: int,
+                      width: int,
+                      left: int,
+                      ranges: tuple[float, ...] = None) -> list:
+    """Returns about 'n' ticks at nice numbers on the time axis as pairs
+    of value and pixel position. The ranges default to those of the
+    frame."""
+    tMin, tMax, _, _ = ranges or self.frameRange()
+    values = self.__time_ticks__.ticks(tMin, tMax, n)
+    pixels = left + (values - tMin) * (width / (tMax - tMin))
+    return [(v, int(p)) for (v, p) in zip(values, pixels)]
+
+  def verticalTicks(self,
+                    n: int,
+                    height: int,
+                    top: int,
+                    ranges: tuple[float, ...] = None) -> list:
+    """Returns about 'n' ticks at nice numbers on the value axis as pairs
+    of value and pixel position, with the largest value at the top."""
+    _, _, vMin, vMax = ranges or self.frameRange()
+    values = self.__value_ticks__.ticks(vMin, vMax, n)
+    pixels = top + height - (values - vMin) * (height / (vMax - vMin))
+    return [(v, int(p)) for (v, p) in zip(values, pixels)]
 
   def _paintOp(self, event: QPaintEvent, painter: QPainter) -> None:
     """Applies the paint operation"""
@@ -58,10 +278,7 @@ class DataPaint(AbstractPaint):
     painter.setPen(borderPen)
     painter.drawRect(rect)
 
-    data = self.dataEcho @ event.rect()
-    painter.setPen(self.pointPen)
-    for (i, point) in enumerate(data):
-      painter.drawPoint(point)
+    self.paintOpData(event, painter)
 
     painter.setPen(minorGridPen)
     t = rect.left() + ceil((width % gridSquareSize) / 2)
@@ -87,7 +304,7 @@ class DataPaint(AbstractPaint):
     horizontalTickWidth = rect.width()
     horizontalTickLeft = rect.left()
     horizontalTickVLine = rect.bottom() + bottomMargin / 2
-    hTicks = self.dataEcho.horizontalTicks(8, rect.width(), rect.left())
+    hTicks = self.horizontalTicks(8, rect.width(), rect.left())
     for tick in hTicks:
       label = '%.3f' % tick[0]
       place = tick[1]
@@ -138,59 +355,154 @@ class DataPaint(AbstractPaint):
       _c += 1
 
   def paintOpData(self, event: QPaintEvent, painter: QPainter) -> None:
-    """Paints the data points"""
-    rect = event.rect()
-    data = self.dataEcho @ event.rect()
+    """Paints the data with a single call for the whole polygon."""
+    self._drawPolygon(painter, self.dataPolygon(event.rect()))
+
+  def _drawPolygon(self, painter: QPainter, polygon: QPolygonF) -> None:
+    """Draws the polygon as points or as a polyline depending on the plot
+    mode."""
+    if polygon.isEmpty():
+      return
     painter.setPen(self.pointPen)
-    for (i, point) in enumerate(data):
-      painter.drawPoint(point)
+    if self.__plot_mode__ is PlotMode.POINTS:
+      painter.drawPoints(polygon)
+    else:
+      painter.drawPolyline(polygon)
+
+  def _horizontalTickLabels(self,
+                            values: np.ndarray,
+                            decimals: int,
+                            painter: QPainter) -> tuple[QSize, list]:
+    """Returns the size of a label on the time axis and the labels of the
+    given tick values as static text."""
+    font = self.tickLabelFont
+    sample = '%.*fs' % (decimals, 69)
+    labelSize = painter.fontMetrics().boundingRect(sample).size()
+    texts = [self._staticText('%.*fs' % (decimals, value), font)
+             for value in values]
+    return labelSize, texts
+
+  def _verticalTickLayout(self,
+                          rect: QRect,
+                          painter: QPainter,
+                          ranges: tuple[float, ...]) -> list:
+    """Lays out the ticks on the value axis as pairs of tick line and
+    label position."""
+    font = self.tickLabelFont
+    vTicks = self.verticalTicks(4, rect.height(), rect.top(), ranges)
+    decimals = self.__value_ticks__.decimals
+    sample = '%.*f' % (decimals, 420)
+    labelSize = painter.fontMetrics().boundingRect(sample).size()
+    verticalTickLine = rect.left() - labelSize.width()
+    layout = []
+    for tick in vTicks:
+      labelRect = QRect(QPoint(0, 0), labelSize)
+      labelRect.moveCenter(QPoint(verticalTickLine, tick[1]))
+      tickLine = QLine(rect.left(), tick[1], labelRect.right(), tick[1])
+      text = self._staticText('%.*f' % (decimals, tick[0]), font)
+      layout.append((tickLine, labelRect.topLeft(), text))
+    return layout
+
+  def _paintTickLayout(self, painter: QPainter, layout: list) -> None:
+    """Draws the tick lines and labels of the layout."""
+    painter.setPen(self.tickLabelPen)
+    painter.setBrush(self.tickFillBrush)
+    for (tickLine, topLeft, text) in layout:
+      painter.drawLine(tickLine)
+      painter.drawStaticText(topLeft, text)
 
   def paintOpHTick(self, event: QPaintEvent, painter: QPainter) -> None:
-    """Paints the ticks"""
+    """Paints the ticks on the time axis. The labels are measured and laid
+    out only when the tick values, the step or the font change, so a
+    scrolling plot only recomputes the pixel positions of the ticks."""
     painter.setFont(self.tickLabelFont)
     rect = event.rect()
     bottomMargin = painter.viewport().height() - rect.bottom()
-    horizontalTickHeight = bottomMargin - 4
-    horizontalTickWidth = rect.width()
-    horizontalTickLeft = rect.left()
-    horizontalTickVLine = rect.bottom() + bottomMargin / 2
-    hTicks = self.dataEcho.horizontalTicks(8, rect.width(), rect.left())
-    labelSize = painter.fontMetrics().boundingRect('%.2fs' % 69).size()
-    for tick in hTicks:
-      label = '%.2fs' % tick[0]
+    tMin, tMax, _, _ = self.frameRange()
+    values = self.__time_ticks__.ticks(tMin, tMax, 8)
+    decimals = self.__time_ticks__.decimals
+    key = (tuple(values.tolist()), self.__time_ticks__.step, decimals,
+           self.tickLabelFont.key())
+    labelSize, texts = self._tickLayout('horizontal', key, lambda: (
+      self._horizontalTickLabels(values, decimals, painter)))
+    pixels = rect.left() + (values - tMin) * (rect.width() / (tMax - tMin))
+    horizontalTickVLine = int(rect.bottom() + bottomMargin / 2)
+    layout = []
+    for (pixel, text) in zip(pixels.astype(int).tolist(), texts):
       labelRect = QRect(QPoint(0, 0), labelSize)
-      labelRect.moveCenter(QPoint(tick[1], horizontalTickVLine))
-      painter.setPen(self.tickLabelPen)
-      painter.setFont(self.tickLabelFont)
-      tickTop = labelRect.top()
-      rect.bottom()
-      tickLine = QLine(tick[1], rect.bottom(), tick[1], tickTop)
-      painter.drawLine(tickLine)
-      painter.drawText(labelRect, label)
+      labelRect.moveCenter(QPoint(pixel, horizontalTickVLine))
+      tickLine = QLine(pixel, rect.bottom(), pixel, labelRect.top())
+      layout.append((tickLine, labelRect.topLeft(), text))
+    self._paintTickLayout(painter, layout)
 
   def paintOpVTick(self, event: QPaintEvent, painter: QPainter) -> None:
-    """Paints the ticks"""
+    """Paints the ticks on the value axis. The layout is reused until the
+    value range, the rectangle or the font changes, and the labels are
+    drawn from cached static text."""
     painter.setFont(self.tickLabelFont)
-    labelSize = painter.fontMetrics().boundingRect('%.2f' % 420).size()
     rect = event.rect()
-    verticalTickLine = rect.left() - labelSize.width()
-    vTicks = self.dataEcho.verticalTicks(4, rect.height(), rect.top())
-    for tick in vTicks:
-      label = '%.2f' % tick[0]
-      labelRect = QRect(QPoint(0, 0), labelSize)
-      labelRect.moveCenter(QPoint(verticalTickLine, tick[1]))
-      painter.setPen(self.tickLabelPen)
-      painter.setFont(self.tickLabelFont)
-      tickLine = QLine(rect.left(), tick[1], labelRect.right(), tick[1])
-      painter.setBrush(self.tickFillBrush)
-      painter.drawLine(tickLine)
-      painter.drawText(labelRect, label)
+    ranges = self.frameRange()
+    _, _, vMin, vMax = ranges
+    key = (vMin, vMax, rect.getRect(), self.tickLabelFont.key())
+    layout = self._tickLayout('vertical', key, lambda: (
+      self._verticalTickLayout(rect, painter, ranges)))
+    self._paintTickLayout(painter, layout)
 
-  def paintOp(self, event: QPaintEvent, painter: QPainter) -> None:
-    """Applies the paint operation"""
+  @staticmethod
+  def _penKey(pen: QPen) -> tuple:
+    """Returns a hashable summary of the pen."""
+    return (pen.color().rgba(), pen.widthF(), pen.style(), pen.capStyle())
+
+  @staticmethod
+  def _brushKey(brush: QBrush) -> tuple:
+    """Returns a hashable summary of the brush."""
+    return brush.color().rgba(), brush.style()
+
+  def _backgroundKey(self, rect: QRect, ratio: float) -> tuple:
+    """Returns the key identifying the cached background."""
+    return (rect.x(), rect.y(), rect.width(), rect.height(), ratio,
+            self._penKey(self.minorGridPen),
+            self._penKey(self.majorGridPen),
+            self._penKey(self.borderPen),
+            self._brushKey(self.fillBrush))
+
+  def _renderBackground(self, rect: QRect, ratio: float) -> QPixmap:
+    """Renders the fill, border and grid layers into a new pixmap with a
+    margin wide enough for the border pen."""
+    margin = ceil(self.borderPen.widthF()) + 1
+    size = rect.size().grownBy(QMargins(margin, margin, margin, margin))
+    pixmap = QPixmap(size * ratio)
+    pixmap.setDevicePixelRatio(ratio)
+    pixmap.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(pixmap)
+    painter.translate(margin - rect.left(), margin - rect.top())
+    event = QPaintEvent(rect)
     self.paintOpFill(event, painter)
     self.paintOpBorder(event, painter)
     self.paintOpGrid(event, painter)
+    painter.end()
+    return pixmap
+
+  def paintOpBackground(self,
+                        event: QPaintEvent,
+                        painter: QPainter) -> None:
+    """Paints the fill, border and grid layers from a cached pixmap. The
+    pixmap is rendered again only when the size, position, pens, fill
+    brush or device pixel ratio change, so a paint caused by new data
+    costs a single blit for these layers."""
+    rect = event.rect()
+    ratio = painter.device().devicePixelRatioF()
+    key = self._backgroundKey(rect, ratio)
+    if key != self.__background_key__:
+      self.__background_cache__ = self._renderBackground(rect, ratio)
+      self.__background_key__ = key
+    margin = ceil(self.borderPen.widthF()) + 1
+    topLeft = rect.topLeft() - QPoint(margin, margin)
+    painter.drawPixmap(topLeft, self.__background_cache__)
+
+  def paintOp(self, event: QPaintEvent, painter: QPainter) -> None:
+    """Applies the paint operation"""
+    self.paintOpBackground(event, painter)
     self.paintOpData(event, painter)
     self.paintOpHTick(event, painter)
     self.paintOpVTick(event, painter)
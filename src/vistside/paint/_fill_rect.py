@@ -8,10 +8,10 @@ from typing import Self
 
 from PySide6.QtGui import QPainter, QPaintEvent
 
-from ezros.gui.factories import emptyPen, parseBrush, parseColor
-from ezros.gui.paint import AbstractPaint
-from ezros.gui.shortnames import Silver
-from ezros.rosutils import Wait
+from vistutils.fields import Wait
+
+from vistside.core import emptyPen, parseBrush, parseColor, Silver
+from vistside.paint import AbstractPaint
 
 
 # from _dep.morevistutils import Wait
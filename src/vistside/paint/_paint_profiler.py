@@ -0,0 +1,239 @@
+"""PaintProfiler records the time spent in each paint operation and paint
+event into histograms keyed by widget class and operation."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+import inspect
+import json
+import os
+import threading
+from functools import wraps
+from math import log2
+from time import perf_counter_ns
+from typing import Any, Callable
+
+import numpy as np
+from PySide6.QtWidgets import QWidget
+
+from vistside.paint import AbstractPaint
+
+
+class PaintProfiler:
+  """PaintProfiler records the wall time spent in each paint operation
+  and paint event into histograms keyed by the class name of the widget
+  being painted and the name of the operation, such as
+  'DataPaint.paintOpData'. Operations running outside a paint event are
+  recorded under an empty widget name.
+
+  The profiler is opt-in. 'enable' wraps every method whose name starts
+  with 'paintOp' on the subclasses of AbstractPaint, and 'disable'
+  restores them, so while disabled the paint operations cost exactly
+  what they did before. 'enable' also wraps every 'paintEvent' defined in
+  Python on the subclasses of QWidget. Since PySide caches the Python
+  override of a virtual method on each widget when it is first called,
+  these wrappers are never removed, but pass straight through while the
+  profiler is disabled, and widgets painted before the first 'enable'
+  keep the unwrapped method. Classes defined after 'enable' is called are
+  wrapped by calling it again.
+
+  Each histogram has a fixed number of bins, a quarter of an octave wide,
+  so memory use does not grow with the number of paints recorded."""
+
+  __enabled__ = False
+  __originals__ = []
+  __event_owners__ = []
+  __histograms__ = {}
+  __totals__ = {}
+  __lock__ = threading.Lock()
+  __local__ = threading.local()
+
+  __bin_count__ = 96
+  __bins_per_octave__ = 4
+  __min_time__ = 256
+
+  @staticmethod
+  def _subclasses(cls: type) -> list[type]:
+    """Returns every subclass of the class, direct or not."""
+    out, pending = [], [*cls.__subclasses__()]
+    while pending:
+      sub = pending.pop()
+      if sub not in out:
+        out.append(sub)
+        pending.extend(sub.__subclasses__())
+    return out
+
+  @classmethod
+  def _currentWidget(cls, ) -> str:
+    """Returns the class name of the widget being painted by the calling
+    thread, or an empty string outside a paint event."""
+    stack = getattr(cls.__local__, 'widgets', None)
+    return stack[-1] if stack else ''
+
+  @classmethod
+  def _wrapOp(cls, function: Callable) -> Callable:
+    """Returns the paint operation wrapped to record its time."""
+    name = function.__name__
+
+    @wraps(function)
+    def wrapper(paint: AbstractPaint, *args, **kwargs) -> Any:
+      start = perf_counter_ns()
+      try:
+        return function(paint, *args, **kwargs)
+      finally:
+        op = '%s.%s' % (type(paint).__name__, name)
+        cls.record(cls._currentWidget(), op, perf_counter_ns() - start)
+
+    return wrapper
+
+  @classmethod
+  def _wrapEvent(cls, function: Callable) -> Callable:
+    """Returns the paint event wrapped to record its time and to key the
+    operations it runs by the class of the widget."""
+
+    @wraps(function)
+    def wrapper(widget: QWidget, *args, **kwargs) -> Any:
+      if not cls.__enabled__:
+        return function(widget, *args, **kwargs)
+      stack = getattr(cls.__local__, 'widgets', None)
+      if stack is None:
+        stack = cls.__local__.widgets = []
+      stack.append(type(widget).__name__)
+      start = perf_counter_ns()
+      try:
+        return function(widget, *args, **kwargs)
+      finally:
+        cls.record(stack.pop(), 'paintEvent', perf_counter_ns() - start)
+
+    return wrapper
+
+  @classmethod
+  def enable(cls, ) -> None:
+    """Wraps the paint operations and paint events not already
+    wrapped."""
+    wrapped = [(owner, name) for (owner, name, _) in cls.__originals__]
+    for owner in [AbstractPaint, *cls._subclasses(AbstractPaint)]:
+      for (name, function) in [*owner.__dict__.items()]:
+        if not name.startswith('paintOp') or (owner, name) in wrapped:
+          continue
+        if inspect.isfunction(function):
+          cls.__originals__.append((owner, name, function))
+          setattr(owner, name, cls._wrapOp(function))
+    for owner in cls._subclasses(QWidget):
+      function = owner.__dict__.get('paintEvent')
+      if inspect.isfunction(function) and owner not in cls.__event_owners__:
+        cls.__event_owners__.append(owner)
+        setattr(owner, 'paintEvent', cls._wrapEvent(function))
+    cls.__enabled__ = True
+
+  @classmethod
+  def disable(cls, ) -> None:
+    """Restores the original paint operations and makes the paint event
+    wrappers pass through. The recorded histograms are kept."""
+    for (owner, name, function) in cls.__originals__:
+      setattr(owner, name, function)
+    cls.__originals__.clear()
+    cls.__enabled__ = False
+
+  @classmethod
+  def isEnabled(cls, ) -> bool:
+    """Returns True if the profiler is enabled."""
+    return cls.__enabled__
+
+  @classmethod
+  def reset(cls, ) -> None:
+    """Clears the recorded histograms."""
+    with cls.__lock__:
+      cls.__histograms__.clear()
+      cls.__totals__.clear()
+
+  @classmethod
+  def record(cls, widget: str, op: str, duration: int) -> None:
+    """Records a duration in nanoseconds for the operation."""
+    ratio = max(duration, 1) / cls.__min_time__
+    index = int(log2(ratio) * cls.__bins_per_octave__) if ratio > 1 else 0
+    index = min(index, cls.__bin_count__ - 1)
+    key = (widget, op)
+    with cls.__lock__:
+      counts = cls.__histograms__.get(key)
+      if counts is None:
+        counts = np.zeros((cls.__bin_count__,), dtype=np.int64)
+        cls.__histograms__[key] = counts
+        cls.__totals__[key] = [0, 0, 0]
+      counts[index] += 1
+      totals = cls.__totals__[key]
+      totals[0] += 1
+      totals[1] += duration
+      totals[2] = max(totals[2], duration)
+
+  @classmethod
+  def binEdges(cls, ) -> np.ndarray:
+    """Returns the edges of the histogram bins in seconds. The first bin
+    also holds shorter times and the last bin also holds longer times."""
+    exponents = np.arange(cls.__bin_count__ + 1) / cls.__bins_per_octave__
+    return cls.__min_time__ * 2.0 ** exponents * 1e-9
+
+  @classmethod
+  def keys(cls, ) -> list[tuple[str, str]]:
+    """Returns the recorded pairs of widget and operation names."""
+    with cls.__lock__:
+      return sorted(cls.__histograms__)
+
+  @classmethod
+  def histogram(cls, widget: str, op: str) -> np.ndarray:
+    """Returns a copy of the counts recorded for the operation."""
+    with cls.__lock__:
+      counts = cls.__histograms__.get((widget, op))
+      if counts is None:
+        return np.zeros((cls.__bin_count__,), dtype=np.int64)
+      return counts.copy()
+
+  @classmethod
+  def summary(cls, widget: str, op: str) -> dict[str, float]:
+    """Returns the count, mean, maximum and the 50th, 90th and 99th
+    percentiles of the recorded times in seconds. The percentiles are
+    the upper edges of the bins they fall in."""
+    with cls.__lock__:
+      counts = cls.__histograms__.get((widget, op))
+      count, total, peak = cls.__totals__.get((widget, op), (0, 0, 0))
+      counts = None if counts is None else counts.copy()
+    out = {'count': count, 'mean': total / count * 1e-9 if count else 0.0,
+           'max': peak * 1e-9}
+    edges = cls.binEdges()[1:]
+    cumulative = np.cumsum(counts) if counts is not None else None
+    for q in (50, 90, 99):
+      if cumulative is None:
+        out['p%d' % q] = 0.0
+        continue
+      index = int(np.searchsorted(cumulative, count * q / 100))
+      out['p%d' % q] = min(float(edges[index]), peak * 1e-9)
+    return out
+
+  @classmethod
+  def report(cls, ) -> str:
+    """Returns a table of the summaries in milliseconds, sorted by the
+    total time spent in each operation."""
+    rows = []
+    for (widget, op) in cls.keys():
+      s = cls.summary(widget, op)
+      rows.append((s['mean'] * s['count'], widget or '-', op, s))
+    rows.sort(key=lambda row: -row[0])
+    header = '%-20s %-32s %8s %9s %9s %9s %9s'
+    lines = [header % ('widget', 'op', 'count', 'mean', 'p50', 'p99', 'max')]
+    for (_, widget, op, s) in rows:
+      lines.append('%-20s %-32s %8d %9.3f %9.3f %9.3f %9.3f' % (
+        widget, op, s['count'], s['mean'] * 1e3, s['p50'] * 1e3,
+        s['p99'] * 1e3, s['max'] * 1e3))
+    return '\n'.join(lines)
+
+  @classmethod
+  def dump(cls, path: str) -> None:
+    """Writes the bin edges, summaries and histograms to a JSON file."""
+    entries = []
+    for (widget, op) in cls.keys():
+      entries.append({'widget': widget, 'op': op,
+                      'summary': cls.summary(widget, op),
+                      'counts': cls.histogram(widget, op).tolist()})
+    data = {'binEdges': cls.binEdges().tolist(), 'entries': entries}
+    with open(os.path.abspath(path), 'w') as file:
+      json.dump(data, file, indent=2)
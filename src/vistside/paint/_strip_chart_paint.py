@@ -0,0 +1,175 @@
+"""StripChartPaint paints a DataRoll as a strip chart scrolling from right
+to left, rendering only the newly exposed strip on each paint."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+from math import ceil
+
+import numpy as np
+from PySide6.QtCore import Qt, QRect, QPoint
+from PySide6.QtGui import QPainter, QPaintEvent, QImage
+
+from vistside.core import decimate
+from vistside.paint import DataPaint
+
+
+class StripChartPaint(DataPaint):
+  """StripChartPaint paints a DataRoll as a strip chart showing the most
+  recent 'timeSpan' seconds, with the newest sample at the right edge.
+  The data layer lives in a persistent QImage. On each paint, the image
+  is shifted left by the whole number of pixels the newest sample has
+  moved, with a single 'drawImage' onto a second image, and only the
+  newly exposed strip on the right is rendered from the new samples. The
+  cost of a paint then depends on the new data and not on the length of
+  the window.
+
+  The value range is fixed while the chart scrolls. It is given as a
+  pair of floats or otherwise taken from the running statistics of the
+  data roll. If a new value falls outside the range, or the size, the
+  device pixel ratio or the pen changes, the whole image is rendered
+  again."""
+
+  __time_span__ = 10.0
+  __fixed_range__ = None
+  __value_range__ = None
+  __strip_image__ = None
+  __spare_image__ = None
+  __strip_key__ = None
+  __right_time__ = None
+
+  def __init__(self, *args) -> None:
+    DataPaint.__init__(self, *args)
+    for arg in args:
+      if isinstance(arg, (int, float)) and not isinstance(arg, bool):
+        self.__time_span__ = float(arg)
+      if isinstance(arg, tuple) and len(arg) == 2:
+        self.__fixed_range__ = (float(arg[0]), float(arg[1]))
+
+  def _newestTime(self, ) -> float:
+    """Returns the time of the newest sample in seconds or None if the
+    data roll is empty."""
+    head, tail = self.dataRoll.timeSegments()
+    newest = tail if tail.shape[0] else head
+    if not newest.shape[0]:
+      return None
+    return float(self.dataRoll.toSeconds(newest[-1]))
+
+  def _chooseValueRange(self, ) -> tuple[float, float]:
+    """Returns the fixed value range or one spanning the running
+    statistics with a margin of a tenth of the span."""
+    if self.__fixed_range__ is not None:
+      return self.__fixed_range__
+    low, high = self.dataRoll.minimum, self.dataRoll.maximum
+    if not low == low:
+      return 0.0, 1.0
+    margin = (high - low) / 10 or 0.5
+    return low - margin, high + margin
+
+  def _isOutOfRange(self, ) -> bool:
+    """Returns True if a held value falls outside the value range."""
+    if self.__fixed_range__ is not None:
+      return False
+    low, high = self.__value_range__
+    return self.dataRoll.minimum < low or self.dataRoll.maximum > high
+
+  def dataRange(self, *args) -> tuple[float, ...]:
+    """Returns the time range shown by the chart and its value range
+    while the chart has been rendered, and otherwise falls back to the
+    range of the data."""
+    if self.__right_time__ is None:
+      return DataPaint.dataRange(self, *args)
+    right = self.__right_time__
+    return (right - self.__time_span__, right, *self.__value_range__)
+
+  def _readWindow(self, t0: float, t1: float) -> tuple[np.ndarray, ...]:
+    """Returns the times in seconds and the values of the samples from
+    't0' to 't1' seconds."""
+    roll = self.dataRoll
+    (timeHead, timeTail), (valueHead, valueTail) = roll.window(
+      int(t0 * 1e9), int(t1 * 1e9))
+    times = roll.toSeconds(np.concatenate((timeHead, timeTail)))
+    return times, np.concatenate((valueHead, valueTail))
+
+  def _renderSpan(self,
+                  image: QImage,
+                  left: int,
+                  width: int) -> None:
+    """Renders the samples falling in the columns from 'left' to 'left +
+    width' of the image, clearing those columns first."""
+    size = image.deviceIndependentSize().toSize()
+    full = QRect(QPoint(0, 0), size)
+    strip = QRect(left, 0, width, size.height())
+    right = self.__right_time__
+    span = self.__time_span__
+    pad = ceil(self.pointPen.widthF()) + 1
+    t0 = right - span * (size.width() - left + pad) / size.width()
+    times, values = self._readWindow(t0, right)
+    painter = QPainter(image)
+    painter.setCompositionMode(
+      QPainter.CompositionMode.CompositionMode_Clear)
+    painter.fillRect(strip, Qt.GlobalColor.transparent)
+    painter.setCompositionMode(
+      QPainter.CompositionMode.CompositionMode_SourceOver)
+    painter.setClipRect(strip)
+    if times.shape[0]:
+      times, values = decimate(times, values, width + pad,
+                               self.__decimation_mode__)
+      ranges = (right - span, right, *self.__value_range__)
+      polygon = self.mapPolygon(times, values, full, ranges)
+      self._drawPolygon(painter, polygon)
+    painter.end()
+
+  def _stripKey(self, rect: QRect, ratio: float) -> tuple:
+    """Returns the key identifying the persistent image."""
+    return (rect.width(), rect.height(), ratio, self.__time_span__,
+            self.__plot_mode__, self._penKey(self.pointPen))
+
+  def _renderAll(self, rect: QRect, ratio: float, newest: float) -> None:
+    """Creates the images and renders the whole window."""
+    images = []
+    for _ in range(2):
+      image = QImage(rect.size() * ratio,
+                     QImage.Format.Format_ARGB32_Premultiplied)
+      image.setDevicePixelRatio(ratio)
+      images.append(image)
+    self.__strip_image__, self.__spare_image__ = images
+    self.__right_time__ = newest
+    self.__value_range__ = self._chooseValueRange()
+    self._renderSpan(self.__strip_image__, 0, rect.width())
+
+  def _scroll(self, rect: QRect, newest: float) -> None:
+    """Shifts the image left by the number of whole pixels the newest
+    sample has moved and renders the exposed strip."""
+    pixelsPerSecond = rect.width() / self.__time_span__
+    shift = int((newest - self.__right_time__) * pixelsPerSecond)
+    if shift <= 0:
+      return
+    self.__right_time__ += shift / pixelsPerSecond
+    image, spare = self.__strip_image__, self.__spare_image__
+    spare.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(spare)
+    painter.drawImage(QPoint(-shift, 0), image)
+    painter.end()
+    self.__strip_image__, self.__spare_image__ = spare, image
+    pad = ceil(self.pointPen.widthF()) + 1
+    left = max(rect.width() - shift - pad, 0)
+    self._renderSpan(spare, left, rect.width() - left)
+
+  def paintOpData(self, event: QPaintEvent, painter: QPainter) -> None:
+    """Paints the data layer from the persistent image, scrolling it and
+    rendering the new strip first if needed."""
+    rect = event.rect()
+    newest = self._newestTime()
+    if newest is None or rect.isEmpty():
+      return
+    ratio = painter.device().devicePixelRatioF()
+    key = self._stripKey(rect, ratio)
+    if key != self.__strip_key__ or self._isOutOfRange():
+      self._renderAll(rect, ratio, newest)
+      self.__strip_key__ = key
+    elif abs(newest - self.__right_time__) >= self.__time_span__:
+      self._renderAll(rect, ratio, newest)
+    else:
+      self._scroll(rect, newest)
+    painter.drawImage(rect.topLeft(), self.__strip_image__)
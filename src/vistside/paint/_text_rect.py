@@ -4,12 +4,11 @@
 from __future__ import annotations
 
 from PySide6.QtGui import QPaintEvent, QPainter, QFontMetricsF, QPaintDevice
+from vistutils.fields import Wait
 from vistutils.waitaminute import typeMsg
 
-from ezros.gui.factories import textPen, parseFont, parseColor
-from ezros.gui.paint import AbstractPaint
-from ezros.gui.shortnames import Black
-from ezros.rosutils import Wait
+from vistside.core import textPen, parseFont, parseColor, Black
+from vistside.paint import AbstractPaint
 
 
 class TextRect(AbstractPaint):
@@ -20,7 +19,6 @@ class TextRect(AbstractPaint):
 
   textLine = Wait(textPen, )
   textFont = Wait(parseFont, 'Arial', 10)
-  fontMetrics = Wait()
 
   def paintOp(self,
               event: QPaintEvent,
@@ -36,7 +34,6 @@ class TextRect(AbstractPaint):
     painter.setFont(self.textFont)
     painter.drawText(event.rect(), text)
 
-  @fontMetrics.CREATE
   def _getFontMetrics(self, **kwargs) -> QFontMetricsF:
     """Getter for the font metrics"""
     if self.__self_font_metrics__ is None:
@@ -46,6 +43,8 @@ class TextRect(AbstractPaint):
       return self._getFontMetrics(recursion=True)
     return self.__self_font_metrics__
 
+  fontMetrics = property(_getFontMetrics)
+
   def __init__(self, *args, **kwargs) -> None:
     color, font = None, None
     color = parseColor(*args, **kwargs, strict=False)
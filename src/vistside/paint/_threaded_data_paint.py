@@ -0,0 +1,173 @@
+"""ThreadedDataPaint renders the data layer of DataPaint on a worker
+thread into a double buffered QImage."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+import threading
+import weakref
+from math import ceil
+
+from PySide6.QtCore import Qt, QRect, QPoint, QMargins, QMetaObject
+from PySide6.QtGui import QPainter, QPaintEvent, QImage
+from PySide6.QtWidgets import QWidget
+
+from vistside.core import decimate, TickEngine
+from vistside.paint import DataPaint
+
+
+class ThreadedDataPaint(DataPaint):
+  """ThreadedDataPaint renders the data layer of DataPaint on a worker
+  thread, so a slow render does not block the event loop. Each paint of
+  the data layer blits the most recently finished image and asks the
+  worker for a new one. The worker reads a consistent snapshot of the
+  data roll, renders it into the back of two QImages and swaps them, and
+  then schedules a paint of the widget through a queued call to its
+  'update' slot. The widget is held by a weak reference. A render is
+  skipped if neither the data nor the request changed since the last
+  one, so an idle plot does not keep the worker busy.
+
+  Once an image is shown, 'dataRange' returns the ranges it was
+  rendered with, so the ticks always match the data on screen. The
+  background and ticks are painted on the thread of the widget from the
+  caches of DataPaint, since pixmaps cannot be used on other threads.
+  The worker starts with the first paint and runs until 'stop' is
+  called. The worker keeps the value range of its images with a
+  TickEngine of its own, so it never touches the one used by the
+  thread of the widget."""
+
+  __worker__ = None
+  __running__ = None
+  __lock__ = None
+  __wake__ = None
+  __request__ = None
+  __rendered__ = None
+  __target__ = None
+  __front_image__ = None
+  __back_image__ = None
+  __front_origin__ = None
+  __front_range__ = None
+  __shown_range__ = None
+  __render_ticks__ = None
+
+  def __init__(self, *args) -> None:
+    DataPaint.__init__(self, *args)
+    self.__lock__ = threading.Lock()
+    self.__wake__ = threading.Event()
+    self.__running__ = False
+    self.__render_ticks__ = TickEngine(4)
+
+  def isRunning(self, ) -> bool:
+    """Returns True if the worker thread is running."""
+    return self.__running__
+
+  def start(self, ) -> None:
+    """Starts the worker thread unless it is running already."""
+    if self.__running__:
+      return
+    self.__running__ = True
+    self.__worker__ = threading.Thread(target=self._run, daemon=True,
+                                       name=type(self).__name__)
+    self.__worker__.start()
+
+  def stop(self, timeout: float = None) -> None:
+    """Stops the worker thread after the render in progress and waits for
+    it to finish for at most 'timeout' seconds."""
+    self.__running__ = False
+    self.__wake__.set()
+    if self.__worker__ is not None:
+      self.__worker__.join(timeout)
+      self.__worker__ = None
+
+  def dataRange(self, *args) -> tuple[float, ...]:
+    """Returns the ranges of the image last shown, or the range of the
+    data before any image is shown."""
+    if args or self.__shown_range__ is None:
+      return DataPaint.dataRange(self, *args)
+    return self.__shown_range__
+
+  def _run(self, ) -> None:
+    """Renders requested images until stopped. A render that fails is not
+    recorded as done, so it is retried on the next wake. However the
+    worker exits, it is marked as stopped unless a newer worker has
+    replaced it, allowing 'start' to restart it."""
+    try:
+      while self.__running__:
+        self.__wake__.wait()
+        self.__wake__.clear()
+        with self.__lock__:
+          request = self.__request__
+        if not self.__running__ or request is None:
+          continue
+        key = (request[0], self.dataRoll.totalCount())
+        if key == self.__rendered__:
+          continue
+        try:
+          self._render(*request[1:])
+        except RuntimeError:
+          continue
+        self.__rendered__ = key
+        self._notify()
+    finally:
+      if self.__worker__ is threading.current_thread():
+        self.__running__ = False
+
+  def _render(self,
+              rect: QRect,
+              ratio: float,
+              hints: QPainter.RenderHint) -> None:
+    """Renders the data into the back image and swaps it to the front.
+    The image extends beyond the rectangle by the width of the pen. If
+    no consistent snapshot can be read, the RuntimeError is raised before
+    the images are touched."""
+    times, values = self._snapshotData()
+    ranges = self._rangeWith(self.__render_ticks__, times, values)
+    margin = ceil(self.pointPen.widthF()) + 1
+    size = rect.size().grownBy(QMargins(margin, margin, margin, margin))
+    image = self.__back_image__
+    if image is None or image.size() != size * ratio:
+      image = QImage(size * ratio, QImage.Format.Format_ARGB32_Premultiplied)
+      image.setDevicePixelRatio(ratio)
+    image.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(image)
+    painter.setRenderHints(hints)
+    painter.translate(margin - rect.left(), margin - rect.top())
+    if times.shape[0]:
+      times, values = decimate(times, values, rect.width(),
+                               self.__decimation_mode__)
+      self._drawPolygon(painter, self.mapPolygon(times, values, rect,
+                                                 ranges))
+    painter.end()
+    with self.__lock__:
+      self.__back_image__ = self.__front_image__
+      self.__front_image__ = image
+      self.__front_origin__ = rect.topLeft() - QPoint(margin, margin)
+      self.__front_range__ = ranges
+
+  def _notify(self, ) -> None:
+    """Schedules a paint of the widget on its own thread."""
+    widget = None if self.__target__ is None else self.__target__()
+    if widget is None:
+      return
+    try:
+      QMetaObject.invokeMethod(widget, 'update',
+                               Qt.ConnectionType.QueuedConnection)
+    except RuntimeError:
+      self.__target__ = None
+
+  def paintOpData(self, event: QPaintEvent, painter: QPainter) -> None:
+    """Blits the most recently rendered image and requests a new one."""
+    device = painter.device()
+    key = (event.rect().getRect(), device.devicePixelRatioF(),
+           self.__plot_mode__, self._penKey(self.pointPen))
+    request = (key, event.rect(), device.devicePixelRatioF(),
+               painter.renderHints())
+    with self.__lock__:
+      self.__request__ = request
+      if isinstance(device, QWidget):
+        self.__target__ = weakref.ref(device)
+      if self.__front_image__ is not None:
+        painter.drawImage(self.__front_origin__, self.__front_image__)
+        self.__shown_range__ = self.__front_range__
+    self.start()
+    self.__wake__.set()
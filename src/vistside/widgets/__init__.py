@@ -6,6 +6,7 @@ from __future__ import annotations
 from ._base_widget import BaseWidget
 from ._base_layout_field import BaseLayoutField
 from ._fill_widget import FillWidget
+from ._paint_widget import PaintWidget
 from ._label_widget import LabelWidget, LabelField
 from ._lcd_field import LCDField
 from ._clock_widget import ClockWidget, ClockField
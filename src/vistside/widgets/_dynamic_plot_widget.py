@@ -9,7 +9,7 @@ import numpy as np
 from PySide6.QtGui import QPainter
 from vistutils.fields import IntField, Wait
 
-from vistside.core import parseParent, ArrayField, DataRollField
+from vistside.core import parseParent, ArrayField, DataRollField, decimate
 from vistside.widgets import BaseWidget
 import sys
 from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout
@@ -20,6 +20,9 @@ from PySide6.QtCore import Qt, QTimer, QObject, QThread, Signal, Slot
 class DynamicPlotWidget(BaseWidget):
   """DynamicPlotWidget provides a widget for plotting dynamic data."""
 
+  __time_buffer__ = None
+  __value_buffer__ = None
+
   dataRoll = DataRollField(128)
 
   def __init__(self, *args, **kwargs) -> None:
@@ -51,10 +54,31 @@ class DynamicPlotWidget(BaseWidget):
     """Appends new data (value, timestamp)."""
     self.dataRoll.append(value)
 
+  def _getBuffers(self, ) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the buffers reused by every update. They are reallocated
+    only if the length of the data roll changes."""
+    n = len(self.dataRoll)
+    if self.__time_buffer__ is None or self.__time_buffer__.shape[0] != n:
+      valueType = self.dataRoll.valueArray.dtype
+      self.__time_buffer__ = np.empty((n,), dtype=np.float64)
+      self.__value_buffer__ = np.empty((n,), dtype=valueType)
+    return self.__time_buffer__, self.__value_buffer__
+
   @Slot()
   def updateSlot(self) -> None:
-    """Updates the plot visualization."""
-    self.series.clear()
-    self.series.appendNp(self.dataRoll.real, self.dataRoll.imag)
+    """Updates the plot visualization. The data roll may be appended to
+    from a worker thread, so the plot reads a consistent snapshot. The
+    snapshot is decimated to the width of the plot area before being
+    handed to the series. If the producer keeps the snapshot from
+    succeeding, the previous frame is kept until the next update."""
+    timeBuffer, valueBuffer = self._getBuffers()
+    try:
+      times, values = self.dataRoll.snapshot(timeBuffer, valueBuffer)
+    except RuntimeError:
+      return
+    times = self.dataRoll.toSeconds(times, times)
+    width = int(self.chart.plotArea().width()) or self.width()
+    times, values = decimate(times, values, width)
+    self.series.replaceNp(times, values)
     # self.chart.update()
     self.update()
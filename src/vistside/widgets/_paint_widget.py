@@ -0,0 +1,118 @@
+"""PaintWidget composites the AbstractPaint operations hooked on its class,
+caching each layer in a pixmap rendered again only when invalidated."""
+#  MIT Licence
+#  Copyright (c) 2024 Asger Jon Vistisen
+from __future__ import annotations
+
+from typing import Any
+
+from PySide6.QtCore import Qt, QPoint
+from PySide6.QtGui import QPaintEvent, QPainter, QPixmap
+from vistutils.text import monoSpace
+
+from vistside.paint import AbstractPaint
+from vistside.widgets import BaseWidget
+
+
+class PaintWidget(BaseWidget):
+  """PaintWidget composites the AbstractPaint operations hooked on its
+  class. Each paint defined in the class body registers itself through
+  'appendHookedPaint' and becomes a layer, painted in the order of
+  definition, with the paints of base classes first.
+
+  Each layer is rendered once into its own transparent pixmap and then
+  blitted on every paint event, until it is invalidated by 'invalidate',
+  by a resize or by a change of the device pixel ratio. A paint that
+  changes between paint events by itself, such as DataPaint, reports so
+  through 'isVolatile' and is painted directly on every paint event
+  instead. Static layers therefore cost a blit on updates changing only
+  the data. A layer whose settings are changed after it was rendered
+  must be invalidated for the change to show."""
+
+  __hooked_paints__ = []
+  __layer_pixmaps__ = None
+  __dirty_layers__ = None
+  __layer_key__ = None
+
+  @classmethod
+  def appendHookedPaint(cls, paint: AbstractPaint) -> None:
+    """Appends the paint to the layers of this class. Called from
+    '__set_name__' on AbstractPaint."""
+    if '__hooked_paints__' not in cls.__dict__:
+      cls.__hooked_paints__ = [*cls.__hooked_paints__]
+    cls.__hooked_paints__.append(paint)
+
+  @classmethod
+  def hookedPaints(cls, ) -> list[AbstractPaint]:
+    """Returns the layers of this class in the order they are painted."""
+    return [*cls.__hooked_paints__]
+
+  def __init__(self, *args, **kwargs) -> None:
+    BaseWidget.__init__(self, *args, **kwargs)
+    self.__layer_pixmaps__ = {}
+    self.__dirty_layers__ = set()
+
+  def _layerIndex(self, layer: Any) -> int:
+    """Returns the index of the layer given as a paint or an index."""
+    if isinstance(layer, int):
+      if 0 <= layer < len(self.__hooked_paints__):
+        return layer
+    else:
+      for (i, paint) in enumerate(self.__hooked_paints__):
+        if paint is layer:
+          return i
+    e = """The layer: '%s' is not hooked on: '%s'!"""
+    raise KeyError(monoSpace(e % (layer, type(self).__name__)))
+
+  def invalidate(self, *layers) -> None:
+    """Marks the given layers, or every layer if none are given, to be
+    rendered again, and schedules a paint event. Layers are given as the
+    paint objects or as their indices."""
+    if not layers:
+      self.__dirty_layers__.update(range(len(self.__hooked_paints__)))
+    for layer in layers:
+      self.__dirty_layers__.add(self._layerIndex(layer))
+    self.update()
+
+  def _renderLayer(self,
+                   index: int,
+                   event: QPaintEvent,
+                   ratio: float) -> QPixmap:
+    """Renders the layer at the index into a transparent pixmap."""
+    pixmap = QPixmap(self.size() * ratio)
+    pixmap.setDevicePixelRatio(ratio)
+    pixmap.fill(Qt.GlobalColor.transparent)
+    #  TextRect reads the text from the paint device
+    pixmap.innerText = getattr(self, 'innerText', None)
+    painter = QPainter()
+    painter.begin(pixmap)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    self.__hooked_paints__[index].paintOp(event, painter)
+    painter.end()
+    return pixmap
+
+  def paintEvent(self, event: QPaintEvent) -> None:
+    """Blits the cached layers and paints the volatile layers directly,
+    rendering the invalidated layers first."""
+    ratio = self.devicePixelRatioF()
+    key = (self.width(), self.height(), ratio)
+    if key != self.__layer_key__:
+      self.__layer_pixmaps__.clear()
+      self.__layer_key__ = key
+    layerEvent = QPaintEvent(self.rect())
+    painter = QPainter()
+    painter.begin(self)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    for (i, paint) in enumerate(self.__hooked_paints__):
+      if paint.isVolatile():
+        painter.save()
+        paint.paintOp(layerEvent, painter)
+        painter.restore()
+        continue
+      pixmap = self.__layer_pixmaps__.get(i)
+      if pixmap is None or i in self.__dirty_layers__:
+        pixmap = self._renderLayer(i, layerEvent, ratio)
+        self.__layer_pixmaps__[i] = pixmap
+      painter.drawPixmap(QPoint(0, 0), pixmap)
+    painter.end()
+    self.__dirty_layers__.clear()